@@ -0,0 +1,191 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from mock_infra import (PartitionedTopic, ConsumerGroup, ConcurrentS3Uploader, FakeS3Client,
+                        DailySchedule, FakeClock, JobScheduler, FakePartnerAPI,
+                        ETLWorker, Scheduler, FanOutScheduler, mock_s3, ETL_CONSUMER_GROUP)
+
+
+class SlowReadETLWorker(ETLWorker):
+    """ETLWorker whose S3 reads take a fixed latency, like a real GET round-trip."""
+    read_latency = 0.01
+
+    def read_file(self, file_path):
+        time.sleep(self.read_latency)
+        return super().read_file(file_path)
+
+
+def bench_consumer_group(num_files, worker_counts, read_latency):
+    """Measures ETL files/sec through the consumer group runtime for several worker counts."""
+    SlowReadETLWorker.read_latency = read_latency
+    print(f"{num_files} files, {read_latency * 1000:.0f}ms simulated S3 read latency")
+    for num_workers in worker_counts:
+        request_id = str(uuid.uuid4())
+        topic = PartitionedTopic("json_filepath_topic", num_partitions=max(worker_counts), capacity=num_files,
+                                 key=lambda message: message["file_path"])  # Pre-filled, so room for every file
+        for index in range(num_files):
+            file_path = f"s3://bench-bucket/{request_id}/client_{index}.json"
+            mock_s3[file_path] = json.dumps({"client_id": index, "account_balance": 1000 + index})
+            topic.append({"file_path": file_path, "request_id": request_id, "partner_id": "PartnerA"})
+
+        group = ConsumerGroup(ETL_CONSUMER_GROUP, topic,
+                              worker_factory=lambda: SlowReadETLWorker(request_id),
+                              handler=SlowReadETLWorker.process_file,
+                              num_workers=num_workers)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # Silence the per-file mock logging
+            group.run_until_drained()
+        elapsed = time.perf_counter() - start
+        print(f"{num_workers:>3} workers: {num_files / elapsed:8.1f} files/sec")
+
+
+def bench_s3_upload(num_objects, concurrency_levels, latency, error_rate):
+    """Measures client uploads/sec to the local S3 stand-in, inline put_object vs ConcurrentS3Uploader."""
+    body = json.dumps({"client_id": "bench", "account_balance": 1000, "padding": "x" * 1024})
+    print(f"{num_objects} objects of {len(body)} bytes, {latency * 1000:.0f}ms simulated S3 latency, "
+          f"{error_rate:.0%} SlowDown errors")
+
+    s3_client = FakeS3Client(latency=latency)  # Inline put_object has no retries, so no injected errors here
+    start = time.perf_counter()
+    for index in range(num_objects):
+        s3_client.put_object(Bucket="bench-bucket", Key=f"inline/client_{index}.json", Body=body)
+    print(f"{'inline put_object':>22}: {num_objects / (time.perf_counter() - start):8.1f} uploads/sec")
+
+    for concurrency in concurrency_levels:
+        s3_client = FakeS3Client(latency=latency, error_rate=error_rate)
+        uploader = ConcurrentS3Uploader(s3_client, max_concurrency=concurrency, backoff_base=latency)
+        start = time.perf_counter()
+        for index in range(num_objects):
+            uploader.submit("bench-bucket", f"concurrent/client_{index}.json", body)
+        failures = uploader.wait()
+        elapsed = time.perf_counter() - start
+        uploader.close()
+        print(f"{concurrency:>11} in flight: {num_objects / elapsed:8.1f} uploads/sec "
+              f"({uploader.stats['retries']} retries, {failures} failed)")
+
+
+def bench_scheduler(num_partners, days, real_jobs):
+    """
+    Schedules num_partners daily requests in assorted timezones on one JobScheduler thread and runs
+    `days` of virtual time with a FakeClock, counting wake-ups against one polling thread per partner
+    checking every minute. Then measures how late real_jobs jobs due in the next second actually start.
+    """
+    timezones = ["UTC", "America/New_York", "America/Chicago", "Europe/London", "Asia/Tokyo", "Australia/Sydney"]
+    rng = random.Random(0)
+    clock = FakeClock(datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc))
+    job_scheduler = JobScheduler(clock)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(num_partners):
+            scheduler = Scheduler(f"https://partner-{index}.example/api/request_accounts", str(uuid.uuid4()),
+                                  job_scheduler=job_scheduler,
+                                  run_at=datetime.time(rng.randrange(24), rng.choice((0, 15, 30, 45))),
+                                  timezone=rng.choice(timezones))
+            scheduler.register()
+        start = time.perf_counter()
+        job_scheduler.run_forever(until=clock.now() + datetime.timedelta(days=days))
+    elapsed = time.perf_counter() - start
+    runs = sum(job.runs for job in job_scheduler.jobs.values())
+    print(f"{num_partners} partners, {days} virtual days: {runs} runs in {elapsed:.2f}s on 1 thread, "
+          f"{clock.waits} wake-ups vs {num_partners * days * 24 * 60} for per-partner minute polling")
+
+    job_scheduler = JobScheduler()
+    lateness = []
+    lock = threading.Lock()
+    due = {}
+    now = job_scheduler.clock.now()
+
+    class At:
+        """A one-off schedule at a fixed instant."""
+        def __init__(self, instant):
+            self.instant = instant
+
+        def next_after(self, instant):
+            return self.instant if instant < self.instant else instant + datetime.timedelta(days=365)
+
+    def record(scheduled_for):
+        with lock:
+            lateness.append((job_scheduler.clock.now() - scheduled_for).total_seconds())
+
+    for index in range(real_jobs):
+        due[index] = now + datetime.timedelta(seconds=0.2 + 0.8 * index / real_jobs)
+        job_scheduler.add_job(f"job-{index}", At(due[index]), record)
+    job_scheduler.start()
+    deadline = time.monotonic() + 5
+    while len(lateness) < real_jobs and time.monotonic() < deadline:
+        time.sleep(0.05)
+    job_scheduler.stop()
+    lateness.sort()
+    print(f"{len(lateness)}/{real_jobs} real-time jobs ran; start lateness p50 {lateness[len(lateness) // 2] * 1000:.2f}ms, "
+          f"max {lateness[-1] * 1000:.2f}ms (minute polling: up to 60000ms, or a missed day)")
+
+
+def bench_fan_out(num_partners, concurrency_levels, latency, error_rate, partner_rate_limit):
+    """
+    Triggers num_partners partners at once through FanOutScheduler against a FakePartnerAPI that
+    throttles any partner sent more than partner_rate_limit calls a second, for several global caps.
+    The last row drops the per-partner limit, so retries of failed calls run into the partner's 429s.
+    """
+    partners = {f"partner-{index}": f"https://partner-{index}.example/api/request_accounts"
+                for index in range(num_partners)}
+    print(f"{num_partners} partners, {latency * 1000:.0f}ms partner latency, {error_rate:.0%} 503s, "
+          f"partners throttle above {partner_rate_limit} calls/sec")
+    rows = [(concurrency, partner_rate_limit) for concurrency in concurrency_levels]
+    rows.append((max(concurrency_levels), None))
+    for concurrency, rate in rows:
+        partner_api = FakePartnerAPI(latency=latency, error_rate=error_rate, rate_limit=partner_rate_limit)
+        fan_out = FanOutScheduler(partners, partner_api=partner_api, max_concurrency=concurrency,
+                                   default_rate=rate)
+        fan_out.fan_out.backoff_base = latency
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # Silence the per-request mock logging
+            results = fan_out.run_daily_requests()
+        elapsed = time.perf_counter() - start
+        request_ids = [result for result in results.values() if isinstance(result, str)]
+        label = f"cap {concurrency}" + ("" if rate else ", no partner limit")
+        print(f"{label:>26}: {elapsed:6.2f}s, {len(request_ids)}/{num_partners} sent "
+              f"({len(set(request_ids))} distinct request_ids), max {partner_api.stats['max_in_flight']} in flight, "
+              f"{fan_out.fan_out.stats['retries']} retries, {partner_api.stats['throttled']} throttled (429)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the ArchitectureTask1 mock workflow.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    group_parser = subparsers.add_parser("consumer-group", help="ETL files/sec scaling with consumer group size")
+    group_parser.add_argument("--files", type=int, default=500)
+    group_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    group_parser.add_argument("--read-latency", type=float, default=0.01)
+
+    upload_parser = subparsers.add_parser("s3-upload", help="Client uploads/sec with concurrent S3 uploads")
+    upload_parser.add_argument("--objects", type=int, default=1000)
+    upload_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    upload_parser.add_argument("--latency", type=float, default=0.02)
+    upload_parser.add_argument("--error-rate", type=float, default=0.01)
+
+    scheduler_parser = subparsers.add_parser("scheduler", help="Wake-ups and start lateness of the heap-based scheduler")
+    scheduler_parser.add_argument("--partners", type=int, default=1000)
+    scheduler_parser.add_argument("--days", type=int, default=30)
+    scheduler_parser.add_argument("--real-jobs", type=int, default=200)
+
+    fan_out_parser = subparsers.add_parser("fan-out", help="Daily request fan-out to many partners with concurrency caps")
+    fan_out_parser.add_argument("--partners", type=int, default=500)
+    fan_out_parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64, 256])
+    fan_out_parser.add_argument("--latency", type=float, default=0.05)
+    fan_out_parser.add_argument("--error-rate", type=float, default=0.05)
+    fan_out_parser.add_argument("--partner-rate-limit", type=float, default=1.0)
+
+    args = parser.parse_args()
+    if args.benchmark == "consumer-group":
+        bench_consumer_group(args.files, args.workers, args.read_latency)
+    elif args.benchmark == "s3-upload":
+        bench_s3_upload(args.objects, args.concurrency, args.latency, args.error_rate)
+    elif args.benchmark == "scheduler":
+        bench_scheduler(args.partners, args.days, args.real_jobs)
+    elif args.benchmark == "fan-out":
+        bench_fan_out(args.partners, args.concurrency, args.latency, args.error_rate, args.partner_rate_limit)
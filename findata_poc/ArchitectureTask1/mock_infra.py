@@ -0,0 +1,1620 @@
+import time
+import bisect
+import json
+import datetime
+import os
+import sys
+import heapq
+import random
+import threading
+import uuid
+import zlib
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from zoneinfo import ZoneInfo
+
+try:
+    import psycopg2  # Only needed by PostgresProcessingStatusStore
+except ImportError:
+    psycopg2 = None
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    class ClientError(Exception):
+        """Stand-in for botocore's ClientError when boto3 is not installed."""
+        def __init__(self, error_response, operation_name):
+            super().__init__(f"An error occurred ({error_response['Error']['Code']}) when calling "
+                             f"the {operation_name} operation")
+            self.response = error_response
+            self.operation_name = operation_name
+
+# Streaming JSON array parser: one copy, shared with FPCodeTask3 (re-exported here for the workflows)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "FPCodeTask3"))
+from json_decoder_FP import iter_json_array
+
+#----------------------------------------------------------------------
+# Partitioned Log (in-memory Kafka topic)
+#----------------------------------------------------------------------
+class PartitionedTopic:
+    """
+    Mocks a Kafka topic: an append-only log split into partitions by message key.
+
+    Each message is addressed by (partition, offset) and is never popped; consumer groups
+    subscribe and commit offsets instead. A topic is one of:
+
+    - a work queue (backpressure=True, the default): a message is kept until every subscribed
+      group has committed it, and a partition holds at most `capacity` of them. append blocks
+      while the partition is full and raises TimeoutError after producer_timeout, so work is
+      never dropped. Subscribe the consuming group before producing to it.
+    - a log (backpressure=False), for status and logging topics: as in Kafka, a partition keeps
+      its latest `capacity` messages (and, with retention_seconds, only those younger than that),
+      so producers never block on a slow or abandoned reader. A group that falls behind resumes
+      at the start of the log, and the messages it never saw are counted in missed_messages(group_id).
+
+    Appending, reading at an offset and committing are all O(1) (amortized), regardless
+    of how large the backlog is.
+    """
+    def __init__(self, name, num_partitions=8, key=None, capacity=10000, backpressure=True,
+                 producer_timeout=30.0, retention_seconds=None, clock=time.monotonic):
+        self.name = name
+        self.num_partitions = num_partitions
+        self.key = key  # Callable mapping a message to its partition key (None = round robin)
+        self.capacity = capacity
+        self.backpressure = backpressure
+        self.producer_timeout = producer_timeout
+        self.retention_seconds = retention_seconds  # Logs only; a work queue keeps what a group still needs
+        self.clock = clock
+        self.partitions = [[] for _ in range(num_partitions)]  # Messages per partition, possibly with a released prefix
+        self.append_times = [[] for _ in range(num_partitions)]  # clock() at append, parallel to partitions
+        self.base_offsets = [0] * num_partitions                # Offset of partitions[p][0]
+        self.start_offsets = [0] * num_partitions               # First retained offset (>= base_offsets[p])
+        self.group_offsets = {}                                 # group_id -> committed offset per partition
+        self.missed = defaultdict(int)                          # group_id -> messages expired before it read them
+        self.expired = 0                                        # Messages dropped by log retention
+        self.cond = threading.Condition()
+        self._next_partition = 0
+
+    def partition_for(self, message):
+        """Picks the partition for a message: stable hash of its key, or round robin."""
+        if self.key is None:
+            partition = self._next_partition
+            self._next_partition = (self._next_partition + 1) % self.num_partitions
+            return partition
+        return zlib.crc32(str(self.key(message)).encode()) % self.num_partitions
+
+    def _end_offset(self, partition):
+        return self.base_offsets[partition] + len(self.partitions[partition])
+
+    def _low_watermark(self, partition):
+        """Lowest offset a subscribed group still needs. Caller holds the lock."""
+        if not self.group_offsets:
+            return self.start_offsets[partition]  # Kept for the first group to subscribe
+        return min(offsets[partition] for offsets in self.group_offsets.values())
+
+    def _release(self, partition, start):
+        """Moves the start of the log up to start, compacting once the released prefix is half the partition. Caller holds the lock."""
+        self.start_offsets[partition] = start
+        released = start - self.base_offsets[partition]
+        if released > 0 and released * 2 >= len(self.partitions[partition]):
+            del self.partitions[partition][:released]
+            del self.append_times[partition][:released]
+            self.base_offsets[partition] = start
+
+    def _expire(self, partition):
+        """Log retention: drops messages past the size or age limit, counting those a group had not read. Caller holds the lock."""
+        old_start = self.start_offsets[partition]
+        start = max(old_start, self._end_offset(partition) - self.capacity)
+        if self.retention_seconds is not None:
+            cutoff = self.clock() - self.retention_seconds
+            start = max(start, self.base_offsets[partition] + bisect.bisect_left(self.append_times[partition], cutoff))
+        if start == old_start:
+            return
+        for group_id, offsets in self.group_offsets.items():
+            unread = start - max(offsets[partition], old_start)
+            if unread > 0:
+                self.missed[group_id] += unread
+        self.expired += start - old_start
+        self._release(partition, start)
+
+    def _has_room(self, partition):
+        return self._end_offset(partition) - self._low_watermark(partition) < self.capacity
+
+    def append(self, message, timeout=None):
+        """
+        Produces a message and returns its (partition, offset). On a work queue this blocks while the
+        partition is full, raising TimeoutError if the consumers do not catch up within timeout seconds.
+        """
+        timeout = self.producer_timeout if timeout is None else timeout
+        with self.cond:
+            partition = self.partition_for(message)
+            if self.backpressure and not self.cond.wait_for(lambda: self._has_room(partition), timeout):
+                raise TimeoutError(f"Topic {self.name} partition {partition} is full "
+                                   f"({self.capacity} uncommitted messages)")
+            self.partitions[partition].append(message)
+            self.append_times[partition].append(self.clock())
+            if not self.backpressure:
+                self._expire(partition)
+            self.cond.notify_all()
+            return partition, self._end_offset(partition) - 1
+
+    def subscribe(self, group_id):
+        """Registers a consumer group, starting at the earliest retained offsets. Idempotent."""
+        with self.cond:
+            if group_id not in self.group_offsets:
+                self.group_offsets[group_id] = list(self.start_offsets)
+
+    def unsubscribe(self, group_id):
+        """Forgets a consumer group's committed offsets, e.g. when a per-request consumer is closed."""
+        with self.cond:
+            self.group_offsets.pop(group_id, None)
+            self.missed.pop(group_id, None)
+            if self.backpressure:
+                for partition in range(self.num_partitions):
+                    self._release(partition, max(self.start_offsets[partition], self._low_watermark(partition)))
+            self.cond.notify_all()
+
+    def committed(self, group_id, partition):
+        """The group's committed offset, moved up to the start of a log whose older messages expired."""
+        with self.cond:
+            return max(self.group_offsets[group_id][partition], self.start_offsets[partition])
+
+    def commit(self, group_id, partition, offset):
+        """Records a group's position; on a work queue, releases what every group has now committed."""
+        with self.cond:
+            self.group_offsets[group_id][partition] = offset
+            if self.backpressure:
+                self._release(partition, max(self.start_offsets[partition], self._low_watermark(partition)))
+            self.cond.notify_all()
+
+    def read(self, partition, offset, max_messages=100):
+        """Returns up to max_messages retained messages of a partition starting at offset."""
+        with self.cond:
+            if not self.backpressure:
+                self._expire(partition)  # Time-based expiry also applies to partitions nobody appends to
+            start = max(offset, self.start_offsets[partition]) - self.base_offsets[partition]
+            return self.partitions[partition][start:start + max_messages]
+
+    def wait_for_messages(self, positions, timeout):
+        """Blocks until any partition in positions ({partition: offset}) has a message at or past its offset."""
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: any(self._end_offset(p) > offset for p, offset in positions.items()), timeout)
+
+    def end_offset(self, partition):
+        """The offset the next message appended to the partition will get."""
+        with self.cond:
+            return self._end_offset(partition)
+
+    def lag(self, group_id):
+        """Retained messages the group has not committed yet, across all partitions (see missed_messages() for the rest)."""
+        with self.cond:
+            offsets = self.group_offsets[group_id]
+            return sum(self._end_offset(p) - max(offsets[p], self.start_offsets[p]) for p in range(self.num_partitions))
+
+    def missed_messages(self, group_id):
+        """Messages of a log that expired before the group read them (always 0 on a work queue)."""
+        with self.cond:
+            return self.missed.get(group_id, 0)
+
+    def __len__(self):
+        """Messages currently retained."""
+        with self.cond:
+            return sum(self._end_offset(p) - self.start_offsets[p] for p in range(self.num_partitions))
+
+
+class TopicConsumer:
+    """
+    A single consumer that owns every partition of a topic for its group. Offsets are
+    committed as each message is returned (Kafka's auto-commit).
+    """
+    def __init__(self, topic, group_id):
+        self.topic = topic
+        self.group_id = group_id
+        self._next_partition = 0
+        topic.subscribe(group_id)
+
+    def poll(self, timeout=0):
+        """Returns the next message, waiting up to timeout seconds for one, or None."""
+        deadline = time.monotonic() + timeout
+        while True:
+            positions = {}
+            for i in range(self.topic.num_partitions):
+                partition = (self._next_partition + i) % self.topic.num_partitions
+                offset = self.topic.committed(self.group_id, partition)
+                messages = self.topic.read(partition, offset, max_messages=1)
+                if messages:
+                    self.topic.commit(self.group_id, partition, offset + 1)
+                    self._next_partition = (partition + 1) % self.topic.num_partitions
+                    return messages[0]
+                positions[partition] = offset
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.topic.wait_for_messages(positions, remaining)
+
+    def drain(self):
+        """Yields every message currently available, without waiting for more."""
+        message = self.poll()
+        while message is not None:
+            yield message
+            message = self.poll()
+
+    def close(self):
+        """Leaves the group; its committed offsets are dropped from the topic."""
+        self.topic.unsubscribe(self.group_id)
+
+#----------------------------------------------------------------------
+# Consumer Group Runtime
+#----------------------------------------------------------------------
+class ConsumerGroup:
+    """
+    Runs N workers on threads as members of one consumer group over a PartitionedTopic.
+
+    Every partition is owned by exactly one live member. Members commit the offset after
+    each message they process (at-least-once delivery). A member that crashes or stops
+    heartbeating for session_timeout seconds is removed, and its partitions are handed to
+    the least loaded survivors, which resume from the last committed offset. Assignment is
+    sticky: live members never lose partitions, so a rebalance never interrupts them.
+    """
+    def __init__(self, group_id, topic, worker_factory, handler, num_workers=4, session_timeout=5.0,
+                 poll_interval=0.05):
+        self.group_id = group_id
+        self.topic = topic
+        self.worker_factory = worker_factory  # Builds the per-member worker, e.g. lambda: ETLWorker(request_id)
+        self.handler = handler                # Called as handler(worker, message), e.g. ETLWorker.process_file
+        self.num_workers = num_workers
+        self.session_timeout = session_timeout
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.assignment = {}       # member_id -> set of partitions
+        self.heartbeats = {}       # member_id -> last heartbeat (monotonic)
+        self.processed = {}        # member_id -> messages processed
+        self.threads = {}
+        self.killed = set()
+        self.generation = 0
+        self.rebalances = 0
+        self.stopping = threading.Event()
+        self.coordinator = None
+        topic.subscribe(group_id)  # Committed offsets live on the topic, like __consumer_offsets
+
+    def start(self):
+        """Starts the workers and the coordinator that watches their heartbeats."""
+        for index in range(self.num_workers):
+            member_id = f"{self.group_id}-{index}"
+            with self.lock:
+                self.assignment[member_id] = set()
+                self.heartbeats[member_id] = time.monotonic()
+                self.processed[member_id] = 0
+            thread = threading.Thread(target=self._run_member, args=(member_id,), daemon=True)
+            self.threads[member_id] = thread
+        with self.lock:
+            self._assign_orphans(range(self.topic.num_partitions))
+        for thread in self.threads.values():
+            thread.start()
+        self.coordinator = threading.Thread(target=self._coordinate, daemon=True)
+        self.coordinator.start()
+
+    def stop(self):
+        """Stops all workers after their current message."""
+        self.stopping.set()
+        for thread in self.threads.values():
+            thread.join()
+        if self.coordinator:
+            self.coordinator.join()
+
+    def kill_worker(self, member_id):
+        """Simulates a crash: the member exits without committing what it is working on."""
+        self.killed.add(member_id)
+
+    def lag(self):
+        """Total messages not yet committed, across all partitions."""
+        return self.topic.lag(self.group_id)
+
+    def wait_until_drained(self, timeout=None):
+        """Waits until every partition is fully committed by the running group."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.lag() > 0:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Consumer group {self.group_id} did not drain within {timeout}s")
+            with self.lock:
+                if not self.assignment:
+                    raise RuntimeError(f"All members of consumer group {self.group_id} died")
+            time.sleep(self.poll_interval)
+
+    def run_until_drained(self, timeout=None):
+        """Starts the group, waits until every partition is fully committed, then stops it."""
+        self.start()
+        try:
+            self.wait_until_drained(timeout)
+        finally:
+            self.stop()
+
+    def _assign_orphans(self, partitions):
+        """Gives each orphaned partition to the live member with the fewest partitions. Caller holds the lock."""
+        if not self.assignment:
+            return
+        for partition in partitions:
+            member_id = min(self.assignment, key=lambda m: (len(self.assignment[m]), m))
+            self.assignment[member_id].add(partition)
+        self.generation += 1
+
+    def _remove_member(self, member_id, reason):
+        """Removes a dead member and rebalances its partitions. Caller holds the lock."""
+        orphans = self.assignment.pop(member_id, set())
+        self.heartbeats.pop(member_id, None)
+        self._assign_orphans(sorted(orphans))
+        self.rebalances += 1
+        print(f"Consumer group {self.group_id}: removed {member_id} ({reason}), "
+              f"reassigned partitions {sorted(orphans)} (generation {self.generation})")
+
+    def _coordinate(self):
+        """Detects dead members (thread exited or heartbeat expired) and triggers a rebalance."""
+        while not self.stopping.is_set():
+            now = time.monotonic()
+            with self.lock:
+                for member_id in list(self.assignment):
+                    if not self.threads[member_id].is_alive():
+                        self._remove_member(member_id, "worker died")
+                    elif now - self.heartbeats[member_id] > self.session_timeout:
+                        self._remove_member(member_id, "session timeout")
+            self.stopping.wait(self.poll_interval)
+
+    def _commit(self, member_id, partition, offset):
+        """Commits an offset, rejected if the member no longer owns the partition (fencing)."""
+        with self.lock:
+            if partition not in self.assignment.get(member_id, ()):
+                return False
+            self.topic.commit(self.group_id, partition, offset)
+            self.processed[member_id] += 1
+            return True
+
+    def _run_member(self, member_id):
+        worker = self.worker_factory()
+        while not self.stopping.is_set():
+            if member_id in self.killed:
+                return  # Simulated crash
+            with self.lock:
+                if member_id not in self.assignment:
+                    return  # Fenced out after a session timeout
+                self.heartbeats[member_id] = time.monotonic()
+                owned = sorted(self.assignment[member_id])
+            positions = {partition: self.topic.committed(self.group_id, partition) for partition in owned}
+
+            idle = True
+            for partition, offset in positions.items():
+                for message in self.topic.read(partition, offset):
+                    if member_id in self.killed:
+                        return  # Simulated crash: exit without committing
+                    self.handler(worker, message)
+                    offset += 1
+                    if not self._commit(member_id, partition, offset):
+                        break
+                    idle = False
+                    with self.lock:
+                        self.heartbeats[member_id] = time.monotonic()
+                    if self.stopping.is_set():
+                        return
+            if idle:
+                self.topic.wait_for_messages(positions, self.poll_interval)
+
+#----------------------------------------------------------------------
+# Workflow State Store
+#----------------------------------------------------------------------
+# Statuses after which a request needs no further work, so it never counts as stalled.
+# An ETL status names its file ("File <path> ETL Completed"), so it is matched by suffix.
+COMPLETED_WORKFLOW_STATUSES = {"Files Downloaded, Extracted, and Uploaded", "File Processing Completed"}
+COMPLETED_WORKFLOW_STATUS_SUFFIXES = (" ETL Completed",)
+
+class WorkflowStateStore:
+    """
+    Current workflow state per request_id, with its transition history and secondary
+    indexes by status and by partner.
+
+    transition() and the lookups are O(1). Requests that are not in a terminal status
+    are kept ordered by last update, so stalled() only walks the requests it returns.
+    """
+    def __init__(self, terminal_statuses=(), terminal_suffixes=(), clock=time.monotonic):
+        self.terminal_statuses = set(terminal_statuses)
+        self.terminal_suffixes = tuple(terminal_suffixes)  # e.g. " ETL Completed" for per-file statuses
+        self.clock = clock  # Injectable for tests
+        self.lock = threading.Lock()
+        self.states = {}                      # request_id -> current state
+        self.by_status = defaultdict(set)     # status -> request_ids
+        self.by_partner = defaultdict(set)    # partner_id -> request_ids
+        self.in_flight = OrderedDict()        # request_id -> last update, least recently updated first
+
+    def is_terminal(self, status):
+        return status in self.terminal_statuses or (isinstance(status, str) and status.endswith(self.terminal_suffixes))
+
+    def transition(self, request_id, status, module=None, partner_id=None, timestamp=None):
+        """Moves a request to a new status, recording the transition in its history."""
+        now = self.clock()
+        with self.lock:
+            state = self.states.get(request_id)
+            if state is None:
+                state = {"request_id": request_id, "status": None, "partner_id": None, "history": []}
+                self.states[request_id] = state
+            else:
+                self._discard_index(self.by_status, state["status"], request_id)
+            if partner_id is not None and partner_id != state["partner_id"]:
+                self._discard_index(self.by_partner, state["partner_id"], request_id)
+                state["partner_id"] = partner_id
+                self.by_partner[partner_id].add(request_id)
+
+            state["history"].append({"status": status, "module": module, "timestamp": timestamp})
+            state.update(status=status, module=module, timestamp=timestamp, updated_at=now)
+            self.by_status[status].add(request_id)
+
+            self.in_flight.pop(request_id, None)
+            if not self.is_terminal(status):
+                self.in_flight[request_id] = now  # Re-inserted at the most recently updated end
+
+    @staticmethod
+    def _discard_index(index, key, request_id):
+        members = index.get(key)
+        if members is not None:
+            members.discard(request_id)
+            if not members:
+                del index[key]
+
+    def _snapshot(self, state):
+        return {**state, "history": list(state["history"])}
+
+    def get(self, request_id):
+        """Returns a copy of the request's current state, or None."""
+        with self.lock:
+            state = self.states.get(request_id)
+            return self._snapshot(state) if state else None
+
+    def history(self, request_id):
+        """Returns the request's status transitions, oldest first."""
+        with self.lock:
+            state = self.states.get(request_id)
+            return list(state["history"]) if state else []
+
+    def with_status(self, status):
+        """Request IDs currently in the given status."""
+        with self.lock:
+            return set(self.by_status.get(status, ()))
+
+    def for_partner(self, partner_id):
+        """Request IDs that belong to the given partner."""
+        with self.lock:
+            return set(self.by_partner.get(partner_id, ()))
+
+    def stalled(self, older_than):
+        """States of non-terminal requests not updated for older_than seconds, oldest first."""
+        cutoff = self.clock() - older_than
+        stalled = []
+        with self.lock:
+            for request_id, updated_at in self.in_flight.items():
+                if updated_at > cutoff:
+                    break
+                stalled.append(self._snapshot(self.states[request_id]))
+        return stalled
+
+#----------------------------------------------------------------------
+# File Processing Status Store
+#----------------------------------------------------------------------
+class InMemoryProcessingStatusStore:
+    """
+    Processing status per file_path with atomic claims, so concurrent ETL workers can
+    never process the same file at once.
+
+    claim() succeeds unless another worker holds a live "processing" claim; a claim
+    older than claim_ttl seconds is considered abandoned (the worker died) and can be
+    reclaimed. Only the current claim holder can move the file out of "processing".
+    """
+    def __init__(self, claim_ttl=900, clock=time.time):
+        self.claim_ttl = claim_ttl
+        self.clock = clock  # Injectable for tests
+        self.lock = threading.Lock()
+        self.by_file = {}  # file_path -> {"message_id", "status", "last_updated"}
+
+    def _is_live_claim(self, entry):
+        return entry["status"] == "processing" and self.clock() - entry["last_updated"] < self.claim_ttl
+
+    def claim(self, file_path, message_id):
+        """Atomically marks the file as processing by message_id. Returns False if it is already claimed."""
+        with self.lock:
+            entry = self.by_file.get(file_path)
+            if entry is not None and self._is_live_claim(entry):
+                return False
+            self.by_file[file_path] = {"message_id": message_id, "status": "processing", "last_updated": self.clock()}
+            return True
+
+    def compare_and_set(self, file_path, message_id, expected_status, new_status):
+        """Sets new_status only if the file is still in expected_status under message_id's claim."""
+        with self.lock:
+            entry = self.by_file.get(file_path)
+            if entry is None or entry["message_id"] != message_id or entry["status"] != expected_status:
+                return False
+            entry.update(status=new_status, last_updated=self.clock())
+            return True
+
+    def release(self, file_path, message_id, status):
+        """Ends message_id's claim with a final status ("completed" or "failed")."""
+        return self.compare_and_set(file_path, message_id, "processing", status)
+
+    def get(self, file_path):
+        with self.lock:
+            entry = self.by_file.get(file_path)
+            return dict(entry) if entry else None
+
+    def is_processing(self, file_path):
+        """O(1): whether a live claim is held on the file."""
+        with self.lock:
+            entry = self.by_file.get(file_path)
+            return entry is not None and self._is_live_claim(entry)
+
+
+class PostgresProcessingStatusStore:
+    """
+    The same claim semantics as InMemoryProcessingStatusStore, backed by
+    financial_data.File_Processing_Status (one row per file_path, see dbcreation.sql),
+    so workers in different processes or hosts share claims. Each operation is a single
+    atomic statement on an autocommit connection.
+    """
+    def __init__(self, connection_string, claim_ttl=900):
+        if psycopg2 is None:
+            raise ImportError("PostgresProcessingStatusStore requires psycopg2 (pip install psycopg2-binary)")
+        self.claim_ttl = claim_ttl
+        self.conn = psycopg2.connect(connection_string)
+        self.conn.autocommit = True
+        self.lock = threading.Lock()  # One shared connection; psycopg2 cursors are not thread-safe
+
+    def _execute(self, query, params):
+        with self.lock:
+            with self.conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.rowcount, cur.fetchone() if cur.description else None
+
+    def claim(self, file_path, message_id):
+        """Atomically marks the file as processing by message_id. Returns False if it is already claimed."""
+        rowcount, _ = self._execute("""
+            INSERT INTO financial_data.File_Processing_Status AS s (message_id, file_path, status, last_updated)
+            VALUES (%s, %s, 'processing', CURRENT_TIMESTAMP)
+            ON CONFLICT (file_path) DO UPDATE
+                SET message_id = EXCLUDED.message_id, status = 'processing', last_updated = CURRENT_TIMESTAMP
+                WHERE s.status <> 'processing'
+                   OR s.last_updated < CURRENT_TIMESTAMP - make_interval(secs => %s);
+        """, (message_id, file_path, self.claim_ttl))
+        return rowcount == 1
+
+    def compare_and_set(self, file_path, message_id, expected_status, new_status):
+        """Sets new_status only if the file is still in expected_status under message_id's claim."""
+        rowcount, _ = self._execute("""
+            UPDATE financial_data.File_Processing_Status
+               SET status = %s, last_updated = CURRENT_TIMESTAMP
+             WHERE file_path = %s AND message_id = %s AND status = %s;
+        """, (new_status, file_path, message_id, expected_status))
+        return rowcount == 1
+
+    def release(self, file_path, message_id, status):
+        """Ends message_id's claim with a final status ("completed" or "failed")."""
+        return self.compare_and_set(file_path, message_id, "processing", status)
+
+    def get(self, file_path):
+        _, row = self._execute("""
+            SELECT message_id, status, last_updated
+              FROM financial_data.File_Processing_Status WHERE file_path = %s;
+        """, (file_path,))
+        if row is None:
+            return None
+        return {"message_id": str(row[0]), "status": row[1], "last_updated": row[2]}
+
+    def is_processing(self, file_path):
+        """Indexed lookup: whether a live claim is held on the file."""
+        _, row = self._execute("""
+            SELECT 1 FROM financial_data.File_Processing_Status
+             WHERE file_path = %s AND status = 'processing'
+               AND last_updated >= CURRENT_TIMESTAMP - make_interval(secs => %s);
+        """, (file_path, self.claim_ttl))
+        return row is not None
+
+#----------------------------------------------------------------------
+# S3: concurrent uploader and local stand-in
+#----------------------------------------------------------------------
+class ConcurrentS3Uploader:
+    """
+    Uploads objects through any boto3-style S3 client on a thread pool.
+
+    At most max_concurrency uploads run at once, and submit() blocks once max_pending
+    uploads are queued, so a fast producer cannot buffer a whole file's worth of bodies.
+    Throttling and server errors are retried with exponential backoff and full jitter.
+    A failed upload (or a failed on_uploaded step after it) is counted by the next wait().
+    Bodies of multipart_threshold bytes or more are sent as a multipart upload.
+    """
+    RETRYABLE_ERROR_CODES = {"SlowDown", "Throttling", "RequestTimeout", "InternalError",
+                             "ServiceUnavailable", "500", "503"}
+
+    def __init__(self, s3_client, max_concurrency=16, max_pending=None, max_attempts=5, backoff_base=0.1,
+                 backoff_max=5.0, multipart_threshold=8 * 1024 * 1024, part_size=8 * 1024 * 1024):
+        self.s3_client = s3_client
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="s3-upload")
+        self.pending = threading.BoundedSemaphore(max_pending or max_concurrency * 4)
+        self.lock = threading.Lock()
+        self.futures = set()
+        self.failures = []  # Exceptions of uploads that failed since the last wait()
+        self.stats = {"uploads": 0, "multipart_uploads": 0, "bytes": 0, "retries": 0, "failures": 0}
+
+    def _is_retryable(self, error):
+        if isinstance(error, ClientError):
+            return str(error.response.get("Error", {}).get("Code")) in self.RETRYABLE_ERROR_CODES
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    def _with_retries(self, operation, **kwargs):
+        """Calls an S3 client operation, retrying transient errors with exponential backoff and jitter."""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return getattr(self.s3_client, operation)(**kwargs)
+            except Exception as e:
+                if attempt == self.max_attempts or not self._is_retryable(e):
+                    raise
+                with self.lock:
+                    self.stats["retries"] += 1
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))))
+
+    def upload(self, bucket, key, body):
+        """Uploads one object synchronously (put_object, or multipart for large bodies)."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if len(body) >= self.multipart_threshold:
+            self._multipart_upload(bucket, key, body)
+        else:
+            self._with_retries("put_object", Bucket=bucket, Key=key, Body=body)
+        with self.lock:
+            self.stats["uploads"] += 1
+            self.stats["bytes"] += len(body)
+        return f"s3://{bucket}/{key}"
+
+    def _multipart_upload(self, bucket, key, body):
+        upload_id = self._with_retries("create_multipart_upload", Bucket=bucket, Key=key)["UploadId"]
+        try:
+            parts = []
+            view = memoryview(body)
+            for part_number, start in enumerate(range(0, len(body), self.part_size), start=1):
+                response = self._with_retries("upload_part", Bucket=bucket, Key=key, UploadId=upload_id,
+                                              PartNumber=part_number, Body=bytes(view[start:start + self.part_size]))
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            self._with_retries("complete_multipart_upload", Bucket=bucket, Key=key, UploadId=upload_id,
+                               MultipartUpload={"Parts": parts})
+        except Exception:
+            self.s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+        with self.lock:
+            self.stats["multipart_uploads"] += 1
+
+    def _upload_and_notify(self, bucket, key, body, on_uploaded):
+        """Runs on an upload thread; the failure is recorded before the future completes, so wait() sees it."""
+        try:
+            path = self.upload(bucket, key, body)
+            if on_uploaded is not None:
+                on_uploaded(path)  # e.g. publishing the path; if that fails, the object is as good as lost
+            return path
+        except Exception as e:
+            with self.lock:
+                self.failures.append(e)
+                self.stats["failures"] += 1
+            raise
+
+    def submit(self, bucket, key, body, on_uploaded=None):
+        """
+        Queues an upload and returns a Future resolving to the object's s3:// path.
+        on_uploaded(path) runs on the upload thread once the object is stored; its errors fail the upload.
+        """
+        self.pending.acquire()  # Backpressure: wait while max_pending uploads are outstanding
+        try:
+            future = self.executor.submit(self._upload_and_notify, bucket, key, body, on_uploaded)
+        except Exception:
+            self.pending.release()
+            raise
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self.lock:
+            self.futures.discard(future)
+        self.pending.release()
+
+    def wait(self):
+        """
+        Blocks until every submitted upload has finished. Returns the number that failed for good since
+        the previous wait(), including ones that failed before this call, and resets that count.
+        """
+        with self.lock:
+            outstanding = list(self.futures)
+        wait(outstanding)
+        with self.lock:
+            failures, self.failures = self.failures, []
+        return len(failures)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class FakeS3Client:
+    """
+    A local stand-in for boto3's S3 client (the subset the workflow uses), storing objects
+    in a dict keyed by "s3://bucket/key", e.g. the workflow's mock_s3. Every call can be
+    given a simulated round-trip latency and a rate of retryable SlowDown errors.
+    """
+    def __init__(self, storage=None, latency=0.0, error_rate=0.0):
+        self.storage = {} if storage is None else storage
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.multipart_uploads = {}  # UploadId -> {part_number: bytes}
+        self.calls = 0
+
+    def _round_trip(self, operation):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            raise ClientError({"Error": {"Code": "SlowDown", "Message": "Please reduce your request rate."}},
+                              operation)
+
+    def put_object(self, Bucket, Key, Body):
+        self._round_trip("PutObject")
+        with self.lock:
+            self.storage[f"s3://{Bucket}/{Key}"] = Body
+        return {"ETag": uuid.uuid4().hex}
+
+    def get_object(self, Bucket, Key):
+        self._round_trip("GetObject")
+        path = f"s3://{Bucket}/{Key}"
+        with self.lock:
+            if path not in self.storage:
+                raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not found"}}, "GetObject")
+            return {"Body": self.storage[path]}
+
+    def create_multipart_upload(self, Bucket, Key):
+        self._round_trip("CreateMultipartUpload")
+        upload_id = uuid.uuid4().hex
+        with self.lock:
+            self.multipart_uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._round_trip("UploadPart")
+        with self.lock:
+            self.multipart_uploads[UploadId][PartNumber] = Body
+        return {"ETag": f"{UploadId}-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._round_trip("CompleteMultipartUpload")
+        with self.lock:
+            parts = self.multipart_uploads.pop(UploadId)
+            body = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+            self.storage[f"s3://{Bucket}/{Key}"] = body
+        return {"Location": f"s3://{Bucket}/{Key}"}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        with self.lock:
+            self.multipart_uploads.pop(UploadId, None)
+        return {}
+
+#----------------------------------------------------------------------
+# Scheduling: heap-based job scheduler
+#----------------------------------------------------------------------
+class SystemClock:
+    """Wall-clock time for JobScheduler: now() is timezone-aware UTC, and waits can be cut short by an event."""
+    def now(self):
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def wait(self, event, timeout):
+        return event.wait(timeout)
+
+
+class FakeClock:
+    """
+    Virtual time for tests and benchmarks: wait() jumps straight to the end of the timeout instead
+    of sleeping, so a month of schedules runs in milliseconds. advance() simulates a stall (e.g.
+    the host was down), after which the scheduler's catch-up policy applies.
+    """
+    def __init__(self, start=None):
+        self.current = start or datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self.waits = 0
+
+    def now(self):
+        return self.current
+
+    def advance(self, seconds):
+        self.current += datetime.timedelta(seconds=seconds)
+
+    def wait(self, event, timeout):
+        self.waits += 1
+        if event.is_set() or timeout is None:
+            return event.wait(timeout)
+        self.advance(max(timeout, 0))
+        return event.is_set()
+
+
+class DailySchedule:
+    """Once a day at a wall-clock time in a timezone, e.g. DailySchedule(datetime.time(11), "America/New_York")."""
+    def __init__(self, at, timezone="UTC"):
+        self.at = at
+        self.timezone = ZoneInfo(timezone)
+
+    def next_after(self, instant):
+        """The first run strictly after the aware datetime instant, as UTC (local DST shifts included)."""
+        local = instant.astimezone(self.timezone)
+        candidate = datetime.datetime.combine(local.date(), self.at, tzinfo=self.timezone)
+        if candidate <= local:
+            candidate = datetime.datetime.combine(local.date() + datetime.timedelta(days=1), self.at,
+                                                  tzinfo=self.timezone)
+        return candidate.astimezone(datetime.timezone.utc)
+
+    def __repr__(self):
+        return f"DailySchedule({self.at.isoformat()} {self.timezone.key})"
+
+
+class ScheduledJob:
+    """A job registered with JobScheduler. func(scheduled_for) is called with the UTC time the run was due."""
+    def __init__(self, name, schedule, func, next_run, catch_up, misfire_grace):
+        self.name = name
+        self.schedule = schedule
+        self.func = func
+        self.next_run = next_run
+        self.catch_up = catch_up
+        self.misfire_grace = misfire_grace
+        self.last_run = None   # scheduled_for of the latest run started
+        self.runs = 0
+        self.skipped = 0       # Missed runs dropped by the catch-up policy
+        self.failures = 0
+        self.cancelled = False
+
+
+class JobScheduler:
+    """
+    Runs many scheduled jobs from one thread: jobs sit in a heap ordered by next due time, and
+    the thread sleeps exactly until the earliest one is due (or until a job is added or removed).
+
+    A run can be missed because the host was down (the job is added with the last_run it
+    recorded) or because the thread was busy past the due time. Each job's catch_up policy decides
+    what happens then:
+        "latest" - run once for the most recent missed time (the default; a late daily pull still happens),
+        "all"    - run once for every missed time, oldest first,
+        "none"   - drop runs that are more than misfire_grace seconds late.
+
+    Jobs run on the scheduler thread unless an executor is given, in which case they are
+    submitted to it so a slow job cannot delay the others. The clock is injectable (see FakeClock).
+    """
+    CATCH_UP_POLICIES = ("latest", "all", "none")
+
+    def __init__(self, clock=None, executor=None, max_wait=3600.0):
+        self.clock = clock or SystemClock()
+        self.executor = executor
+        self.max_wait = max_wait  # Re-check at least this often, so wall-clock jumps (NTP, suspend) are noticed
+        self.jobs = {}
+        self.heap = []          # (next_run, sequence, job); entries whose time no longer matches the job are stale
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def add_job(self, name, schedule, func, last_run=None, catch_up="latest", misfire_grace=60.0):
+        """
+        Registers (or replaces) a job. last_run is when it last ran, e.g. restored from the workflow state;
+        runs due since then count as missed. Without it, the first run is the next one due from now.
+        """
+        if catch_up not in self.CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {self.CATCH_UP_POLICIES}, not {catch_up!r}")
+        next_run = schedule.next_after(last_run if last_run is not None else self.clock.now())
+        job = ScheduledJob(name, schedule, func, next_run, catch_up, misfire_grace)
+        job.last_run = last_run
+        with self.lock:
+            previous = self.jobs.get(name)
+            if previous is not None:
+                previous.cancelled = True
+            self.jobs[name] = job
+            self._push(job)
+        self.wakeup.set()
+        return job
+
+    def remove_job(self, name):
+        with self.lock:
+            job = self.jobs.pop(name, None)
+            if job is not None:
+                job.cancelled = True
+        self.wakeup.set()
+
+    def _push(self, job):
+        """Caller must hold the lock."""
+        self.sequence += 1
+        heapq.heappush(self.heap, (job.next_run, self.sequence, job))
+
+    def _runs_due(self, job, now):
+        """Advances job.next_run past now and returns the scheduled times to run, per the catch-up policy."""
+        due = []
+        while job.next_run <= now:
+            due.append(job.next_run)
+            job.next_run = job.schedule.next_after(job.next_run)
+        if job.catch_up == "all":
+            runs = due
+        elif job.catch_up == "latest":
+            runs = due[-1:]
+        else:
+            runs = [at for at in due if (now - at).total_seconds() <= job.misfire_grace]
+        job.skipped += len(due) - len(runs)
+        return runs
+
+    def _run(self, job, scheduled_for):
+        job.last_run = scheduled_for
+        job.runs += 1
+        try:
+            job.func(scheduled_for)
+        except Exception as e:
+            job.failures += 1
+            print(f"Scheduled job {job.name} failed for {scheduled_for.isoformat()}: {e}")
+
+    def run_pending(self):
+        """Runs every job that is due now. Returns the number of runs started."""
+        now = self.clock.now()
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                at, _, job = heapq.heappop(self.heap)
+                if job.cancelled or at != job.next_run:
+                    continue  # Removed, replaced, or rescheduled since this entry was pushed
+                due.extend((job, scheduled_for) for scheduled_for in self._runs_due(job, now))
+                self._push(job)
+        for job, scheduled_for in due:
+            if self.executor is not None:
+                self.executor.submit(self._run, job, scheduled_for)
+            else:
+                self._run(job, scheduled_for)
+        return len(due)
+
+    def seconds_until_next(self):
+        """Seconds until the earliest job is due (0 if overdue), or None when no jobs are scheduled."""
+        with self.lock:
+            while self.heap and (self.heap[0][2].cancelled or self.heap[0][0] != self.heap[0][2].next_run):
+                heapq.heappop(self.heap)
+            if not self.heap:
+                return None
+            next_run = self.heap[0][0]
+        return max((next_run - self.clock.now()).total_seconds(), 0.0)
+
+    def run_forever(self, until=None):
+        """
+        Runs jobs as they fall due until stop() is called (or, with until, once the clock passes it).
+        One wake-up per due time, not one per polling interval.
+        """
+        while not self.stopped.is_set():
+            self.wakeup.clear()  # Before running, so an add_job from another thread meanwhile still wakes the wait below
+            self.run_pending()
+            if until is not None and self.clock.now() >= until:
+                return
+            timeout = self.seconds_until_next()
+            timeout = self.max_wait if timeout is None else min(timeout, self.max_wait)
+            if until is not None:
+                remaining = max((until - self.clock.now()).total_seconds(), 0.0)
+                timeout = min(timeout, remaining)
+            self.clock.wait(self.wakeup, timeout)
+
+    def start(self):
+        """Runs run_forever on a daemon thread (once)."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run_forever, name="JobScheduler", daemon=True)
+            self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+
+#----------------------------------------------------------------------
+# Partner fan-out: rate limits, a global concurrency cap, and a local partner API stand-in
+#----------------------------------------------------------------------
+class PartnerRequestError(Exception):
+    """A partner API call answered with a non-success status; PartnerFanOut retries the retryable ones."""
+    def __init__(self, partner_id, status):
+        super().__init__(f"Partner {partner_id} answered {status}")
+        self.partner_id = partner_id
+        self.status = status
+
+
+class TokenBucket:
+    """A rate limit of `rate` calls per second, allowing bursts of up to `burst` calls."""
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """Takes a token if one is available and returns 0.0, else returns the seconds until there is one."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Takes a token, sleeping until one is available. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class PartnerFanOut:
+    """
+    Calls func(partner_id) for many partners at once on a pool of max_concurrency threads, which
+    is the global cap on calls in flight. Each partner also has its own TokenBucket
+    (rate_limits[partner_id] as (rate, burst), else default_rate), taken for every attempt,
+    including retries, so one partner never sees more than its agreed request rate.
+
+    A PartnerRequestError with a retryable status (429, 5xx) is retried with exponential backoff
+    and full jitter; other exceptions fail that partner only.
+
+    Waiting for a token or a backoff never ties up a thread or a slot: run() keeps every pending
+    attempt in a heap by due time. An attempt takes its slot first and its token right before the
+    call, so calls that waited for a slot cannot bunch up and exceed the partner's rate.
+    """
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_concurrency=64, rate_limits=None, default_rate=None, max_attempts=4,
+                 backoff_base=0.5, backoff_max=30.0):
+        self.max_concurrency = max_concurrency
+        self.rate_limits = rate_limits or {}
+        self.default_rate = default_rate
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiters = {}
+        self.slots = threading.BoundedSemaphore(max_concurrency)  # Shared by concurrent run()s
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rate_limited_seconds": 0.0}
+
+    def limiter(self, partner_id):
+        """The partner's TokenBucket (shared across runs), or None when it has no rate limit."""
+        with self.lock:
+            if partner_id not in self.limiters:
+                rate, burst = self.rate_limits.get(partner_id, (self.default_rate, 1))
+                self.limiters[partner_id] = TokenBucket(rate, burst) if rate else None
+            return self.limiters[partner_id]
+
+    def _attempt(self, index, partner_id, func, attempt, due, results, cond):
+        """
+        Worker, holding a slot: takes the partner's token and makes one call, then records the result or
+        schedules a retry. Without a token it gives the slot back and re-queues the attempt for when one is due.
+        """
+        result = retry_at = None
+        try:
+            limiter = self.limiter(partner_id)
+            delay = limiter.try_acquire() if limiter is not None else 0.0
+            if delay:
+                retry_at = time.monotonic() + delay
+                with self.lock:
+                    self.stats["rate_limited_seconds"] += delay
+            else:
+                with self.lock:
+                    self.stats["calls"] += 1
+                try:
+                    result = func(partner_id)
+                except PartnerRequestError as e:
+                    if attempt == self.max_attempts or e.status not in self.RETRYABLE_STATUSES:
+                        result = e
+                    else:
+                        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+                        retry_at, attempt = time.monotonic() + backoff, attempt + 1
+                        with self.lock:
+                            self.stats["retries"] += 1
+        except Exception as e:
+            result, retry_at = e, None
+        finally:
+            self.slots.release()
+        with cond:
+            if retry_at is not None:
+                heapq.heappush(due, (retry_at, index, attempt))
+            else:
+                results[partner_id] = result
+                if isinstance(result, Exception):
+                    with self.lock:
+                        self.stats["failures"] += 1
+            cond.notify()
+
+    def run(self, partner_ids, func):
+        """
+        Calls func for every partner and waits for all of them. Returns {partner_id: result}, where a
+        partner that failed for good maps to its exception (one partner's failure never stops the rest).
+        """
+        partner_ids = list(dict.fromkeys(partner_ids))
+        due = [(0.0, index, 1) for index in range(len(partner_ids))]  # (due_at, partner index, attempt)
+        results = {}
+        cond = threading.Condition()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="partner-fan-out") as executor:
+            while True:
+                with cond:
+                    while len(results) < len(partner_ids) and (not due or due[0][0] > time.monotonic()):
+                        cond.wait(due[0][0] - time.monotonic() if due else None)
+                    if len(results) == len(partner_ids):
+                        break
+                    _, index, attempt = heapq.heappop(due)
+                self.slots.acquire()  # A free slot means a free thread, so the attempt starts at once
+                executor.submit(self._attempt, index, partner_ids[index], func, attempt, due, results, cond)
+        return {partner_id: results[partner_id] for partner_id in partner_ids}
+
+
+class FakePartnerAPI:
+    """
+    A local stand-in for the partners' request_accounts endpoints, for load tests. Every call takes
+    `latency` seconds and answers 201, or 503 for an `error_rate` share of calls, or 429 when a partner
+    receives more than rate_limit calls within one second. Tracks calls in flight and request_ids seen.
+    """
+    def __init__(self, latency=0.05, error_rate=0.0, rate_limit=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.lock = threading.Lock()
+        self.recent_calls = defaultdict(list)   # partner_id -> call times within the last second
+        self.request_ids = defaultdict(set)     # partner_id -> request_ids received
+        self.in_flight = 0
+        self.stats = {"calls": 0, "created": 0, "throttled": 0, "errors": 0, "max_in_flight": 0}
+
+    def request_accounts(self, partner_id, partner_api_url, request_id):
+        now = time.monotonic()
+        with self.lock:
+            self.stats["calls"] += 1
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+            recent = self.recent_calls[partner_id] = [at for at in self.recent_calls[partner_id] if now - at < 1.0]
+            recent.append(now)
+            throttled = self.rate_limit is not None and len(recent) > self.rate_limit
+        try:
+            time.sleep(self.latency)
+            with self.lock:
+                if throttled:
+                    self.stats["throttled"] += 1
+                    return 429
+                if self.error_rate and random.random() < self.error_rate:
+                    self.stats["errors"] += 1
+                    return 503
+                self.stats["created"] += 1
+                self.request_ids[partner_id].add(request_id)
+                return 201
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+#----------------------------------------------------------------------
+# Workflow: topics, stores and the components shared by mock_workflow1 and mock_workflow2
+# (each workflow module adds its own FileProcessor, and ETLWorker subclass if needed, for its file format)
+#----------------------------------------------------------------------
+# Mock Kafka (in-memory, partitioned and bounded). Status and log topics expire old messages like a
+# Kafka log; the file topics are work queues whose producers wait for the consumers instead.
+workflow_topic = PartitionedTopic("workflow_topic", key=lambda message: message["request_id"], backpressure=False)
+logging_topic = PartitionedTopic("logging_topic", key=lambda message: message["request_id"], backpressure=False)
+zip_filepath_topic = PartitionedTopic("zip_filepath_topic", key=lambda message: message["request_id"])
+json_filepath_topic = PartitionedTopic("json_filepath_topic", key=lambda message: message["file_path"])
+
+# Workflow state per request_id, indexed by status and partner (what the workflow topic is compacted into)
+workflow_state = WorkflowStateStore(terminal_statuses=COMPLETED_WORKFLOW_STATUSES,
+                                    terminal_suffixes=COMPLETED_WORKFLOW_STATUS_SUFFIXES)
+
+# File processing claims indexed by file_path. Swap in PostgresProcessingStatusStore
+# to share claims through financial_data.File_Processing_Status across hosts.
+processing_status = InMemoryProcessingStatusStore(claim_ttl=900)
+mock_s3 = {}
+mock_db = {}  # Mock database (in-memory)
+
+# Consumer Group Name
+ETL_CONSUMER_GROUP = "ETLWorkers"
+ETL_WORKERS = 4  # Number of ETLWorker members started in the consumer group
+
+DAILY_REQUEST_TIME = datetime.time(16, 0)  # 4 PM UTC (11 AM EST)
+DAILY_REQUEST_TIMEZONE = "UTC"
+PARTNER_FANOUT_CONCURRENCY = 64  # Partner requests in flight at once across all partners
+PARTNER_RATE_LIMIT = 1.0         # Default requests/sec per partner (retries included)
+
+
+class WorkflowComponent:
+    """Status updates and logs for one request_id, tagged with the component's module name."""
+    module = None
+
+    def update_workflow_topic(self, status, partner_id=None):  #Uses self.request_id, no request_id as a parameter
+        """Mocks publishing a status update for this request to the workflow Kafka topic."""
+        message = {
+            "module": self.module,
+            "request_id": self.request_id,
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "status": status,
+        }
+        workflow_topic.append(message)
+        workflow_state.transition(self.request_id, status, module=self.module, partner_id=partner_id,
+                                  timestamp=message["timestamp"])
+        print(f"Updated workflow topic: {message}")
+
+    def log_status(self, message, timestamp=None, request_id=None):  #Uses self.request_id unless one is passed
+        """Mocks logging to the observability Kafka topic."""
+        log_message = {
+            "module": self.module,
+            "request_id": request_id or self.request_id,
+            "timestamp": timestamp or datetime.datetime.utcnow().isoformat(),
+            "message": message,
+        }
+        logging_topic.append(log_message)
+        print(f"Logged: {log_message}")
+
+
+class Scheduler(WorkflowComponent):
+    module = "Scheduler"
+
+    def __init__(self, partner_api_url, request_id, job_scheduler=None, run_at=DAILY_REQUEST_TIME,
+                 timezone=DAILY_REQUEST_TIMEZONE, last_run=None, partner_id=None, partner_api=None,
+                 on_request=None):  # Takes request_id
+        self.partner_api_url = partner_api_url
+        self.partner_id = partner_id
+        self.partner_api = partner_api  # e.g. mock_infra.FakePartnerAPI; the call is simulated when None
+        # Called with (request_id, partner_id) once the partner accepts a request, e.g. to build that
+        # run's WebhookListener, FileProcessor and ETLWorkers (they only handle messages for their request_id)
+        self.on_request = on_request
+        self.daily_request_made = False
+        self.lock = threading.Lock()
+        self.request_id = request_id # The first run's request_id; never reassigned
+        self.first_run_pending = True  # Whether request_id is still unused (guarded by lock)
+        # Many partners can share one JobScheduler (one thread); each gets its own time and timezone
+        self.job_scheduler = job_scheduler or JobScheduler()
+        self.schedule = DailySchedule(run_at, timezone)
+        self.last_run = last_run  # When the daily request last ran, so runs missed while down are caught up
+
+    def register(self):
+        """Adds this partner's daily request to the job scheduler."""
+        return self.job_scheduler.add_job(f"daily-request:{self.partner_api_url}", self.schedule,
+                                          self.run_daily_request, last_run=self.last_run)
+
+    def schedule_daily_request(self):
+        """Runs the daily request at 4 PM UTC (11 AM EST) by default, sleeping until it is due rather than polling."""
+        self.register()
+        self.job_scheduler.run_forever()
+
+    def run_daily_request(self, scheduled_for):
+        """
+        Job callback: a new due time starts a new day, so the once-a-day guard is reset first. Each day's
+        request gets its own request_id (the one passed in is used for the first run only, even when the
+        scheduler resumes from a last_run). Returns the run's request_id.
+        """
+        with self.lock:
+            self.daily_request_made = False
+            if self.first_run_pending:
+                request_id = self.request_id
+                self.first_run_pending = False
+            else:
+                request_id = str(uuid.uuid4())
+        self.make_request(request_id)
+        with self.lock:
+            self.last_run = scheduled_for
+        print(f"Daily request triggered for {scheduled_for.isoformat()}.")
+        return request_id
+
+    def validate_request(self):
+        """Mocks request validation (rate limiting)."""
+        with self.lock:
+            if self.daily_request_made:
+                print("Request blocked: Only one request allowed per day.")
+                return False
+            else:
+                return True
+
+    def make_request(self, request_id=None):
+        """
+        Simulates making an API request to the partner for request_id (self.request_id by default).
+        Returns the response code (None if blocked).
+        """
+        request_id = request_id or self.request_id
+        if self.validate_request():
+            timestamp = datetime.datetime.utcnow().isoformat()
+
+            print(f"Making request to {self.partner_api_url}...")
+
+            # Simulate API call (replace with actual API call)
+            # Assuming partner returns 201 Created on success.  Here, just simulate.
+            response_code = 201
+            if self.partner_api is not None:
+                response_code = self.partner_api.request_accounts(self.partner_id, self.partner_api_url,
+                                                                  request_id)
+            if response_code == 201:
+                print("Received 201 Created.")
+                self.enqueue_workflow_message(request_id)
+                self.log_status("Request sent", timestamp, request_id=request_id)
+                with self.lock:
+                    self.daily_request_made = True
+                if self.on_request is not None:
+                    self.on_request(request_id, self.partner_id)
+            else:
+                print(f"Request failed with code: {response_code}")
+                self.log_status(f"Request failed with code: {response_code}", timestamp, request_id=request_id)
+            return response_code
+
+
+    def enqueue_workflow_message(self, request_id=None):  #uses self.request_id unless one is passed
+        """Mocks enqueueing a message onto the workflow Kafka topic."""
+        request_id = request_id or self.request_id
+        message = {
+            "module": "Scheduler",
+            "request_id": request_id,
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "status": "Request Initiated",
+        }
+        workflow_topic.append(message)
+        workflow_state.transition(request_id, message["status"], module="Scheduler", partner_id=self.partner_id,
+                                  timestamp=message["timestamp"])
+        print(f"Enqueued to workflow topic: {message}")
+
+
+class FanOutScheduler:
+    """
+    Triggers the daily request for many partners at the same time (4 PM UTC by default) from one job.
+    Each partner gets a fresh request_id per run (kept across that run's retries), and the calls go out
+    concurrently: at most max_concurrency in flight, each partner within its own rate limit.
+    """
+    def __init__(self, partners, partner_api=None, job_scheduler=None, run_at=DAILY_REQUEST_TIME,
+                 timezone=DAILY_REQUEST_TIMEZONE, max_concurrency=PARTNER_FANOUT_CONCURRENCY,
+                 rate_limits=None, default_rate=PARTNER_RATE_LIMIT):
+        self.partners = partners  # partner_id -> partner_api_url
+        self.partner_api = partner_api
+        self.job_scheduler = job_scheduler or JobScheduler()
+        self.schedule = DailySchedule(run_at, timezone)
+        self.fan_out = PartnerFanOut(max_concurrency=max_concurrency, rate_limits=rate_limits,
+                                     default_rate=default_rate)
+
+    def register(self):
+        return self.job_scheduler.add_job("daily-request-fan-out", self.schedule, self.run_daily_requests)
+
+    def schedule_daily_requests(self):
+        self.register()
+        self.job_scheduler.run_forever()
+
+    def run_daily_requests(self, scheduled_for=None):
+        """Requests every partner's data. Returns {partner_id: request_id or the exception it failed with}."""
+        schedulers = {partner_id: Scheduler(partner_api_url, str(uuid.uuid4()), job_scheduler=self.job_scheduler,
+                                            partner_id=partner_id, partner_api=self.partner_api)
+                      for partner_id, partner_api_url in self.partners.items()}
+
+        def request_partner(partner_id):
+            scheduler = schedulers[partner_id]
+            response_code = scheduler.make_request()
+            if response_code is not None and response_code != 201:
+                raise PartnerRequestError(partner_id, response_code)
+            return scheduler.request_id
+
+        results = self.fan_out.run(schedulers, request_partner)
+        failed = [partner_id for partner_id, result in results.items() if isinstance(result, Exception)]
+        print(f"Daily requests sent to {len(results) - len(failed)}/{len(results)} partners"
+              + (f"; failed: {', '.join(map(str, failed))}" if failed else "."))
+        return results
+
+
+class WebhookListener(WorkflowComponent):
+    module = "WebhookListener"
+
+    def __init__(self, request_id):  # Takes request_id
+        self.request_id = request_id
+        self.partner_secrets = {
+            "partner_secret_1": "PartnerA",
+            "partner_secret_2": "PartnerB",
+        }
+
+    def receive_webhook(self, request):
+        """Mocks receiving a webhook call."""
+        zip_file_url = request.get("zip_file_url")
+        partner_secret = request.get("partner_secret")
+
+        partner_id = self.lookup_partner_id(partner_secret)
+
+        if not partner_id:
+            print("Webhook validation failed: Invalid Partner Secret.")
+            return "Webhook validation failed: Invalid Partner Secret", 403
+
+        if not self.validate_webhook(partner_id): #Uses self.request_id and takes only partnerId as parameter
+            return "Webhook validation failed", 403
+
+        if zip_file_url:
+            print(f"Received webhook from Partner {partner_id} with zip file URL: {zip_file_url}")
+            self.enqueue_file_download(zip_file_url, partner_id) # No request_id parameter but partner ID is still included
+            self.update_workflow_topic("Webhook Received", partner_id) #No request_id parameter as it uses self.request_id
+            self.log_status(f"Webhook received and enqueued download from Partner {partner_id}")
+            return "Webhook received", 200
+        else:
+            self.log_status(f"Webhook received from Partner {partner_id} but missing zip_file_url")
+            return "Missing zip_file_url", 400
+
+    def lookup_partner_id(self, partner_secret):
+        """Looks up the partner ID based on the secret key."""
+        return self.partner_secrets.get(partner_secret)
+
+    def validate_webhook(self, partner_id): #Uses self.request_id
+        """Mocks webhook validation."""
+        # Check if the request_id matches the expected value (from the scheduler)
+        if not partner_id:
+            print("Webhook validation failed: Invalid Partner ID.")
+            return False
+        print(f"Webhook validated for Request: {self.request_id}.")
+        return True
+
+    def enqueue_file_download(self, zip_file_url, partner_id):  #Uses self.request_id, no request_id as a parameter
+        """Mocks enqueueing the zip file URL for download."""
+        message = {"zip_file_url": zip_file_url, "request_id": self.request_id, "partner_id": partner_id}
+        zip_filepath_topic.append(message)
+        print(f"Enqueued to zip_filepath_topic: {message}")
+
+
+class ETLWorker(WorkflowComponent):
+    module = "ETLWorker"
+
+    def __init__(self, request_id): # Takes request_id
+        self.request_id = request_id # Tie component to a request_id
+        self.consumer_group = ETL_CONSUMER_GROUP # all workers from the same group.
+    def process_file(self, message):
+        """Processes a single JSON file."""
+        if message["request_id"] != self.request_id:
+            print(f"Skipping message (wrong request_id): {message}")
+            return
+
+        file_path = message["file_path"]
+        partner_id = message["partner_id"]
+        message_id = str(uuid.uuid4())
+
+        try:
+            if not self.claim_file(message_id, file_path):
+                print(f"File {file_path} is already being processed. Skipping.")
+                return
+
+            file_contents = self.read_file(file_path)
+            data = json.loads(file_contents)
+            self.validate_data(data)
+            transformed_data = self.transform_data(data)
+            self.write_to_database(transformed_data, partner_id, message["request_id"])  # Pass request_id
+
+            self.set_processing_status(message_id, file_path, "completed")
+            self.update_workflow_topic(f"File {file_path} ETL Completed", partner_id)
+            self.log_status(f"File {file_path} ETL completed")
+
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            self.log_status(f"Error processing {file_path}: {e}")
+            self.set_processing_status(message_id, file_path, "failed")
+            self.update_workflow_topic(f"File {file_path} ETL Failed: {e}", partner_id)
+
+    def read_file(self, file_path):
+        """Mocks reading the file from S3."""
+        print(f"Reading file from {file_path}...")
+        # Simulate reading from S3
+        if file_path in mock_s3:
+            return mock_s3[file_path]
+        else:
+            raise Exception(f"File not found in S3: {file_path}")
+
+    def validate_data(self, data):
+        """Mocks validating the JSON data."""
+        print(f"Validating data: {data}...")
+        # Simulate schema validation, required fields, etc.
+        if not isinstance(data, dict) or "client_id" not in data or "account_balance" not in data:
+            raise ValueError("Invalid data format")
+
+    def transform_data(self, data):
+        """Mocks transforming the data."""
+        print(f"Transforming data: {data}...")
+        # Simulate data transformations (normalization, mapping, etc.)
+        transformed_data = {
+            "client_id": data["client_id"],
+            "account_balance": float(data["account_balance"]),
+            "processed_at": datetime.datetime.utcnow().isoformat(),
+        }
+        return transformed_data
+
+    def write_to_database(self, data, partner_id, request_id): # Added request_id as parameter
+        """Mocks writing data to the database."""
+        print(f"Writing data to database: {data} from Partner {partner_id}...")
+        # Simulate database insertion.  Implement Idempotency here.
+        client_id = data["client_id"]
+        # Simulate the unique constraint
+        unique_key = f"{request_id}-{partner_id}-{client_id}-{datetime.date.today()}" #unique_key is now request_id aware
+
+        # Check if this client's data for today has already been written
+        if unique_key in mock_db:
+            print(f"Data for client {client_id} from Partner {partner_id} on {datetime.date.today()} already exists. Skipping write.")
+            return  # Skip the write, maintaining idempotency
+
+        mock_db[unique_key] = data  # Store the data in the mock database
+        print(f"Data written for client {client_id} from Partner {partner_id}.")
+
+    def is_processing(self, file_path):
+        """Checks if the file is currently being processed (indexed lookup by file_path)."""
+        return processing_status.is_processing(file_path)
+
+    def claim_file(self, message_id, file_path):
+        """Atomically claims the file for this message, so no other worker processes it concurrently."""
+        claimed = processing_status.claim(file_path, message_id)
+        if claimed:
+            print(f"Updated processing status for {file_path}: processing")
+        return claimed
+
+    def set_processing_status(self, message_id, file_path, status):
+        """Records the outcome of this message's claim; ignored if the claim expired and was taken over."""
+        if processing_status.release(file_path, message_id, status):
+            print(f"Updated processing status for {file_path}: {status}")
+        else:
+            print(f"Claim on {file_path} is no longer held by {message_id}; status {status} not recorded")
+
+
+class Monitor:
+    def __init__(self, error_threshold=3, request_id = None):
+        self.error_threshold = error_threshold
+        self.error_count = 0
+        self.request_id = request_id
+        # Subscribe up front so this request's logs are read from its start (while the topic retains them)
+        self.log_consumer = TopicConsumer(logging_topic, f"Monitor-{request_id}")
+
+    def close(self):
+        """Leaves the per-request log consumer group, so logging_topic does not keep its offsets forever."""
+        self.log_consumer.close()
+
+    def check_logs(self):
+      """Simulates checking logs for errors and anomalies."""
+      # Only check logs related to the current request_id; each log is read once, as it arrives
+      errors = [log for log in self.log_consumer.drain() if "Error" in log["message"] and log["request_id"] == self.request_id]
+      missed = logging_topic.missed_messages(self.log_consumer.group_id)
+      if missed:
+          print(f"Warning: {missed} log messages expired before they were checked (request_id: {self.request_id}).")
+
+      if errors:
+          self.error_count += len(errors)
+          print(f"Found {len(errors)} errors in logs (request_id: {self.request_id}).")
+          for error in errors:
+              print(f"  - {error}")
+      else:
+          print(f"No errors found in logs for request_id: {self.request_id}.")
+
+      if self.error_count > self.error_threshold:
+          self.trigger_alert(f"Error count exceeded threshold ({self.error_threshold})")
+          self.error_count = 0  # Reset counter after alerting.
+
+    def check_workflow(self):
+        """Simulates checking the workflow state of this request for stalled processes."""
+        state = workflow_state.get(self.request_id)  # O(1) lookup by request_id
+        incomplete_workflows = [state] if state and not workflow_state.is_terminal(state["status"]) else []
+        if incomplete_workflows:
+            print(f"Found {len(incomplete_workflows)} incomplete workflows for request_id: {self.request_id}.")
+            for workflow in incomplete_workflows:
+                print(f"  - Request ID: {workflow['request_id']}, Status: {workflow['status']}")
+                #Potentially trigger alerts for stalled workflows.
+        else:
+            print(f"No incomplete workflows found for request_id: {self.request_id}.")
+
+    def check_stalled_workflows(self, stall_after=3600):
+        """Alerts on every request (any partner) with no workflow progress for stall_after seconds."""
+        stalled = workflow_state.stalled(stall_after)  # Walks only the stalled requests
+        for workflow in stalled:
+            self.trigger_alert(f"Stalled workflow - Request ID: {workflow['request_id']}, "
+                               f"Partner: {workflow['partner_id']}, Status: {workflow['status']}")
+        if not stalled:
+            print(f"No stalled workflows (no progress for {stall_after}s).")
+
+    def trigger_alert(self, message):
+        """Mocks triggering an alert (e.g., sending an email or Slack message)."""
+        print(f"ALERT: {message}")
+        # In a real system, you would send an email, Slack notification, etc.
+        # using libraries like `smtplib` or `slack_sdk`.
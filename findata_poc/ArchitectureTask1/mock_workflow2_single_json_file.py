@@ -1,5 +1,4 @@
 import time
-import datetime
 import uuid
 import random
 import zipfile
@@ -7,180 +6,32 @@ import json
 import os
 import threading  # For simulating asynchronous tasks
 import tempfile #For creating temporary directory
-import shutil  # For removing directory
 import boto3  # For interacting with S3 (install with `pip install boto3`)
 from botocore.exceptions import ClientError
+# Topics, stores, Scheduler, WebhookListener, the ETLWorker base and Monitor are shared with mock_workflow1
+from mock_infra import (TopicConsumer, ConsumerGroup, WorkflowComponent, Scheduler,
+                        WebhookListener, Monitor, zip_filepath_topic, json_filepath_topic, mock_s3,
+                        ETL_CONSUMER_GROUP, ETL_WORKERS, ConcurrentS3Uploader, FakeS3Client, iter_json_array)
+from mock_infra import ETLWorker as BaseETLWorker
 
-# Mock Kafka (in-memory)
-workflow_topic = []
-logging_topic = []
-zip_filepath_topic = []
-json_filepath_topic = []
-processing_status = {}
-mock_s3 = {}
-
-# Consumer Group Name
-ETL_CONSUMER_GROUP = "ETLWorkers"
-
-#----------------------------------------------------------------------
-# 1. Scheduling & Outbound Request Module (Updated)
-#----------------------------------------------------------------------
-class Scheduler:
-    def __init__(self, partner_api_url, request_id):  # Takes request_id
-        self.partner_api_url = partner_api_url
-        self.daily_request_made = False
-        self.lock = threading.Lock()
-        self.request_id = request_id # Holds the current request_id
-
-    def schedule_daily_request(self):
-        """Simulates a daily scheduled task."""
-        while True:  # Run indefinitely
-            now = datetime.datetime.utcnow()
-            # Check if it's 4 PM UTC (11 AM EST)
-            if now.hour == 16 and now.minute == 0 and not self.daily_request_made:
-                self.make_request()
-                with self.lock:
-                    self.daily_request_made = True
-                print("Daily request triggered.")
-
-            elif now.hour != 16:
-                with self.lock:
-                    self.daily_request_made = False  # Reset after the day passes
-            time.sleep(60)  # Check every minute
-
-
-    def validate_request(self):
-        """Mocks request validation (rate limiting)."""
-        with self.lock:
-            if self.daily_request_made:
-                print("Request blocked: Only one request allowed per day.")
-                return False
-            else:
-                return True
-
-    def make_request(self):
-        """Simulates making an API request to the partner."""
-        if self.validate_request():
-            timestamp = datetime.datetime.utcnow().isoformat()
-
-            print(f"Making request to {self.partner_api_url}...")
-
-            # Simulate API call (replace with actual API call)
-            # Assuming partner returns 201 Created on success.  Here, just simulate.
-            response_code = 201
-            if response_code == 201:
-                print("Received 201 Created.")
-                self.enqueue_workflow_message() # No parameters as it uses self.request_id
-                self.log_status("Request sent", timestamp)
-                with self.lock:
-                    self.daily_request_made = True
-            else:
-                print(f"Request failed with code: {response_code}")
-                self.log_status(f"Request failed with code: {response_code}", timestamp)
-
-
-    def enqueue_workflow_message(self):  #uses self.request_id
-        """Mocks enqueueing a message onto the workflow Kafka topic."""
-        message = {
-            "module": "Scheduler",
-            "request_id": self.request_id,
-            "timestamp": datetime.datetime.utcnow().isoformat(),
-            "status": "Request Initiated",
-        }
-        workflow_topic.append(message)
-        print(f"Enqueued to workflow topic: {message}")
-
-    def log_status(self, message, timestamp): # uses self.request_id
-        """Mocks logging to the observability Kafka topic."""
-        log_message = {
-            "module": "Scheduler",
-            "request_id": self.request_id,
-            "timestamp": timestamp,
-            "message": message,
-        }
-        logging_topic.append(log_message)
-        print(f"Logged: {log_message}")
+S3_UPLOAD_CONCURRENCY = 16  # Client uploads FileProcessor keeps in flight at once (1 = upload inline)
+CLIENTS_PER_CHUNK = 1000  # Clients per newline-delimited JSON object in S3 (1 = one object per client)
 
 #----------------------------------------------------------------------
-# 2. Webhook Listener Module (Updated)
+# File Download/Storage/Extraction Module (Updated)
 #----------------------------------------------------------------------
-class WebhookListener:
-    def __init__(self, request_id):  # Takes request_id
-        self.request_id = request_id
-        self.partner_secrets = {
-            "partner_secret_1": "PartnerA",
-            "partner_secret_2": "PartnerB",
-        }
-
-    def receive_webhook(self, request):
-        """Mocks receiving a webhook call."""
-        zip_file_url = request.get("zip_file_url")
-        partner_secret = request.get("partner_secret")
-
-        partner_id = self.lookup_partner_id(partner_secret)
-
-        if not partner_id:
-            print("Webhook validation failed: Invalid Partner Secret.")
-            return "Webhook validation failed: Invalid Partner Secret", 403
-
-        if not self.validate_webhook(partner_id): #Uses self.request_id and takes only partnerId as parameter
-            return "Webhook validation failed", 403
-
-        if zip_file_url:
-            print(f"Received webhook from Partner {partner_id} with zip file URL: {zip_file_url}")
-            self.enqueue_file_download(zip_file_url, partner_id) # No request_id parameter but partner ID is still included
-            self.update_workflow_topic("Webhook Received") #No request_id parameter as it uses self.request_id
-            self.log_status(f"Webhook received and enqueued download from Partner {partner_id}")
-            return "Webhook received", 200
-        else:
-            self.log_status(f"Webhook received from Partner {partner_id} but missing zip_file_url")
-            return "Missing zip_file_url", 400
-
-    def lookup_partner_id(self, partner_secret):
-        """Looks up the partner ID based on the secret key."""
-        return self.partner_secrets.get(partner_secret)
-
-    def validate_webhook(self, partner_id): #Uses self.request_id
-        """Mocks webhook validation."""
-        # Check if the request_id matches the expected value (from the scheduler)
-        if not partner_id:
-            print("Webhook validation failed: Invalid Partner ID.")
-            return False
-        print(f"Webhook validated for Request: {self.request_id}.")
-        return True
+class FileProcessor(WorkflowComponent):
+    module = "FileProcessor"
 
-    def enqueue_file_download(self, zip_file_url, partner_id):  #Uses self.request_id, no request_id as a parameter
-        """Mocks enqueueing the zip file URL for download."""
-        message = {"zip_file_url": zip_file_url, "request_id": self.request_id, "partner_id": partner_id}
-        zip_filepath_topic.append(message)
-        print(f"Enqueued to zip_filepath_topic: {message}")
-
-    def update_workflow_topic(self, status):  #Uses self.request_id, no request_id as a parameter
-        """Mocks updating the workflow Kafka topic."""
-        message = next((item for item in workflow_topic if item["request_id"] == self.request_id), None)
-        if message:
-            message["status"] = status
-            print(f"Updated workflow topic: {message}")
-
-    def log_status(self, message):   #Uses self.request_id, no request_id as a parameter
-        """Mocks logging to the observability Kafka topic."""
-        log_message = {
-            "module": "WebhookListener",
-            "request_id": self.request_id,
-            "timestamp": datetime.datetime.utcnow().isoformat(),
-            "message": message,
-        }
-        logging_topic.append(log_message)
-        print(f"Logged: {log_message}")
-
-#----------------------------------------------------------------------
-# 3. File Download/Storage/Extraction Module (Updated)
-#----------------------------------------------------------------------
-class FileProcessor:
-    def __init__(self, s3_bucket="my-s3-bucket", request_id=None):
+    def __init__(self, s3_bucket="my-s3-bucket", request_id=None, streaming=True, s3_client=None,
+                 upload_concurrency=S3_UPLOAD_CONCURRENCY, clients_per_chunk=CLIENTS_PER_CHUNK):
         self.s3_bucket = s3_bucket
         self.request_id = request_id
-        self.s3_client = boto3.client('s3') # Initialize s3_client
+        self.clients_per_chunk = clients_per_chunk # One S3 object and one Kafka message per chunk of clients
+        self.streaming = streaming # Read zip members straight into the JSON parser instead of extracting to disk
+        self.s3_client = s3_client or boto3.client('s3') # Initialize s3_client (or use e.g. mock_infra.FakeS3Client)
+        # Per-client uploads are small and latency-bound, so keep many in flight (with retries and multipart)
+        self.uploader = ConcurrentS3Uploader(self.s3_client, max_concurrency=upload_concurrency) if upload_concurrency > 1 else None
 
     def process_file_message(self, message):
         """Processes a message from the file Kafka topic."""
@@ -193,51 +44,111 @@ class FileProcessor:
 
         try:
             zip_file_path = self.download_file(zip_file_url)
-            extracted_files = self.extract_files(zip_file_path)
-            for extracted_file in extracted_files:
-                self.process_extracted_file(extracted_file, partner_id)
+            if self.streaming:
+                self.process_zip_members(zip_file_path, partner_id)
+            else:
+                with tempfile.TemporaryDirectory() as temp_dir:  # Removed once the files are processed
+                    extracted_files = self.extract_files(zip_file_path, temp_dir)
+                    for extracted_file in extracted_files:
+                        self.process_extracted_file(extracted_file, partner_id)
+
+            if self.uploader is not None:
+                failed_uploads = self.uploader.wait()  # Every client is in S3 (or has failed) before we report done
+                if failed_uploads:
+                    raise Exception(f"{failed_uploads} client uploads to S3 failed")
 
-            self.update_workflow_topic("Files Downloaded, Extracted, and Uploaded")
+            self.update_workflow_topic("Files Downloaded, Extracted, and Uploaded", partner_id)
             self.log_status("Files processed successfully")
 
         except Exception as e:
             print(f"Error processing file: {e}")
             self.log_status(f"Error processing file: {e}")
-            self.update_workflow_topic(f"File Processing Failed: {e}")
+            self.update_workflow_topic(f"File Processing Failed: {e}", partner_id)
+
+    def process_zip_members(self, zip_file_path, partner_id):
+        """Streams each JSON member of the zip straight from the archive into the JSON parser, without touching disk."""
+        print(f"Streaming files from {zip_file_path}...")
+        try:
+            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+                for member in zip_ref.infolist():
+                    if member.is_dir():
+                        continue
+                    with zip_ref.open(member) as member_file:  # Decompressed incrementally as it is read
+                        self.process_client_stream(member_file, member.filename, partner_id)
+
+        except zipfile.BadZipFile as e:
+            print(f"Error reading zip file: {e}")
+            self.log_status(f"Error reading zip file: {e}")
+            raise
 
     def process_extracted_file(self, extracted_file_path, partner_id):
          """Processes JSON data, now handled from FileProcessor.extract_files"""
+         with open(extracted_file_path, 'rb') as f:
+             self.process_client_stream(f, extracted_file_path, partner_id)
+
+    def process_client_stream(self, fileobj, source_name, partner_id):
+         """Uploads and publishes each client of a JSON array, parsing one client at a time."""
+         if self.clients_per_chunk > 1:
+             return self.process_client_stream_chunked(fileobj, source_name, partner_id)
 
+         index = 0
+         publish = lambda s3_file_path: self.publish_file_path(s3_file_path, partner_id)  # Only once the upload has landed
          try:
-             with open(extracted_file_path, 'r') as f: #Read the whole extracted files
-                 file_contents = f.read()
-                 data = json.loads(file_contents) # Load the zip file content
-         except Exception as e:
-                 print(f"Error reading or parsing JSON from {extracted_file_path}: {e}")
-                 self.log_status(f"Error reading or parsing JSON from {extracted_file_path}: {e}")
-                 return
-
-         # Check if the JSON data is an array
-         if isinstance(data, list):
-             for index, client_data in enumerate(data): #Data can now contain client_data in the format of array.
+             for index, client_data in enumerate(iter_json_array(fileobj)): #Data can now contain client_data in the format of array.
                  try:
                      # Create a unique file name for each client
-                     s3_file_path = self.upload_client_data_to_s3(client_data, extracted_file_path, index)
-                     if s3_file_path:
-                         self.publish_file_path(s3_file_path, partner_id) #Upload to S3 and publish
-                     else:
+                     s3_file_path = self.upload_client_data_to_s3(client_data, source_name, index, on_uploaded=publish)
+                     if not s3_file_path:
                          print("s3_file_path for client_data file not valid")
 
                  except Exception as e:
                      print(f"Error processing client data at index {index}: {e}")
                      self.log_status(f"Error processing client data at index {index}: {e}")
 
-         else:
-             print(f"Unexpected JSON structure in {extracted_file_path}: Not a JSON array")
-             self.log_status(f"Unexpected JSON structure in {extracted_file_path}: Not a JSON array")
+         except ValueError as e:  # Not a JSON array, or malformed JSON (json.JSONDecodeError)
+             print(f"Error reading or parsing JSON from {source_name} near client index {index}: {e}")
+             self.log_status(f"Error reading or parsing JSON from {source_name} near client index {index}: {e}")
+
+    def process_client_stream_chunked(self, fileobj, source_name, partner_id):
+         """Uploads and publishes the clients of a JSON array in chunks of clients_per_chunk, as newline-delimited JSON."""
+         lines = []
+         first_index = 0
+         index = 0
+         try:
+             for index, client_data in enumerate(iter_json_array(fileobj)):
+                 lines.append(json.dumps(client_data).encode("utf-8") + b"\n")
+                 if len(lines) == self.clients_per_chunk:
+                     self.upload_client_chunk_to_s3(lines, source_name, first_index, partner_id)
+                     lines = []
+                     first_index = index + 1
+
+         except ValueError as e:  # Not a JSON array, or malformed JSON; the clients parsed so far are still uploaded
+             print(f"Error reading or parsing JSON from {source_name} near client index {index}: {e}")
+             self.log_status(f"Error reading or parsing JSON from {source_name} near client index {index}: {e}")
+
+         if lines:
+             self.upload_client_chunk_to_s3(lines, source_name, first_index, partner_id)
+
+    def upload_client_chunk_to_s3(self, lines, extracted_file_path, first_index, partner_id):
+        """
+        Uploads a chunk of clients (one JSON document per line) as a single S3 object and publishes it once
+        it lands, with an offset index: offsets[i]:offsets[i + 1] is the byte range of the i-th client.
+        """
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+
+        base_name, _ = os.path.splitext(os.path.basename(extracted_file_path))
+        s3_key = f"{self.request_id}/{base_name}_clients_{first_index}-{first_index + len(lines) - 1}.ndjson"
+        publish = lambda s3_file_path: self.publish_file_path(s3_file_path, partner_id, offsets)
+
+        if not self.upload_to_s3(b"".join(lines), self.s3_bucket, s3_key, publish):
+            print(f"S3 upload error for client chunk {s3_key}")
+            return None
+        return f"s3://{self.s3_bucket}/{s3_key}"
 
-    def upload_client_data_to_s3(self, client_data, extracted_file_path, index):
-        """Uploads a single client's JSON data to S3."""
+    def upload_client_data_to_s3(self, client_data, extracted_file_path, index, on_uploaded=None):
+        """Uploads a single client's JSON data to S3. on_uploaded(s3_file_path) runs once the upload succeeds."""
         try:
             # Create a unique file name for each client
             original_filename = os.path.basename(extracted_file_path)
@@ -251,7 +162,8 @@ class FileProcessor:
             s3_key = f"{self.request_id}/{s3_file_name}"  # Include request_id in the S3 key
             #self.s3_client.put_object(Bucket=self.s3_bucket, Key=s3_key, Body=client_json_data) #Using Put
 
-            self.upload_to_s3(client_json_data, self.s3_bucket, s3_key) # Calling generalized client function
+            if not self.upload_to_s3(client_json_data, self.s3_bucket, s3_key, on_uploaded): # Calling generalized client function
+                return None
 
             s3_file_path = f"s3://{self.s3_bucket}/{s3_key}"
 
@@ -270,14 +182,23 @@ class FileProcessor:
         if random.random() < 0.1:  # 10% chance of failure
             raise Exception("Network error during download")
         time.sleep(1)  # Simulate download time
-        return "downloaded_data.zip"  # Mock path
+        self.create_dummy_zip_file("downloaded_partner_data.zip", num_files=3)  # Create on first call
+        return "downloaded_partner_data.zip"  # Mock path
 
-    def extract_files(self, zip_file_path):
-        """Extracts JSON files from the zip file to a local temp directory."""
-        print(f"Extracting files from {zip_file_path}...")
+    def create_dummy_zip_file(self, zip_file_name, num_files=3, clients_per_file=5):
+        """Creates a dummy zip file of JSON files, each holding an array of client records."""
+        if os.path.exists(zip_file_name): # Only create if it doesn't exist.
+            return  # File already exists
 
-        # Create a temporary directory for extraction
-        temp_dir = tempfile.mkdtemp()
+        with zipfile.ZipFile(zip_file_name, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+            for i in range(num_files):
+                clients = [{"client_id": f"{i}_{n}", "account_balance": random.randint(1000, 100000)}
+                           for n in range(clients_per_file)]
+                zip_file.writestr(f"client_{i}.json", json.dumps(clients))
+
+    def extract_files(self, zip_file_path, temp_dir):
+        """Extracts JSON files from the zip file to a local temp directory (non-streaming mode)."""
+        print(f"Extracting files from {zip_file_path}...")
         extracted_files = []
 
         try:
@@ -286,7 +207,8 @@ class FileProcessor:
                 #Build extracted file paths
                 for filename in zip_ref.namelist():
                     extracted_file_path = os.path.join(temp_dir, filename)
-                    extracted_files.append(extracted_file_path)
+                    if not os.path.isdir(extracted_file_path):
+                        extracted_files.append(extracted_file_path)
 
             print(f"Extracted files to: {temp_dir}")
             return extracted_files
@@ -296,12 +218,19 @@ class FileProcessor:
             self.log_status(f"Error extracting zip file: {e}")
             raise
 
-        finally:
-            pass #shutil.rmtree(temp_dir)  # Clean up the temporary directory after processing
-
-    def upload_to_s3(self, file_contents, bucket, key):
-        """Uploads a file to S3 from string content."""
+    def upload_to_s3(self, file_contents, bucket, key, on_uploaded=None):
+        """
+        Uploads a file to S3 from string content and calls on_uploaded(s3_file_path) once it lands.
+        With a concurrent uploader this only queues the upload (returning True) and on_uploaded
+        runs on an upload thread; uploader.wait() blocks until all queued uploads are done.
+        """
         print(f"Uploading to S3: s3://{bucket}/{key}...")
+        if self.uploader is not None:
+            future = self.uploader.submit(bucket, key, file_contents,
+                                          on_uploaded=lambda path: self.on_upload_done(path, on_uploaded))
+            future.add_done_callback(self.log_upload_failure)
+            return True
+
         try:
             #self.s3_client.upload_fileobj(file_contents, bucket, key)
             self.s3_client.put_object(Bucket=bucket, Key=key, Body=file_contents)
@@ -310,148 +239,37 @@ class FileProcessor:
             print(f"Error uploading to S3: {e}")
             self.log_status(f"Error uploading to S3: {e}")
             return False
+        if on_uploaded:
+            on_uploaded(f"s3://{bucket}/{key}")
         return True
 
-    def publish_file_path(self, file_path, partner_id):
-        """Mocks publishing a file path to the processing topic."""
-        message = {"file_path": file_path, "request_id": self.request_id, "partner_id": partner_id}
-        json_filepath_topic.append(message)
-        print(f"Published to json_filepath_topic: {message}")
+    def on_upload_done(self, s3_file_path, on_uploaded=None):
+        """Runs on the upload thread once a concurrent upload lands; an error here (e.g. publishing) fails the upload."""
+        print(f"Uploaded successfully to {s3_file_path}")
+        if on_uploaded:
+            on_uploaded(s3_file_path)
 
-    def update_workflow_topic(self, status):
-        """Mocks updating the workflow Kafka topic."""
-        message = next((item for item in workflow_topic if item["request_id"] == self.request_id), None)
-        if message:
-            message["status"] = status
-            print(f"Updated workflow topic: {message}")
-
-    def log_status(self, message):
-        """Mocks logging to the observability Kafka topic."""
-        log_message = {
-            "module": "FileProcessor",
-            "request_id": self.request_id,
-            "timestamp": datetime.datetime.utcnow().isoformat(),
-            "message": message,
-        }
-        logging_topic.append(log_message)
-        print(f"Logged: {log_message}")
-    def __init__(self, s3_bucket="my-s3-bucket", request_id=None):  # Takes request_id
-        self.s3_bucket = s3_bucket
-        self.request_id = request_id
+    def log_upload_failure(self, future):
+        """Completion callback: logs an upload that failed for good (retries exhausted, or its publish failed)."""
+        if future.exception() is not None:
+            print(f"Error uploading to S3: {future.exception()}")
+            self.log_status(f"Error uploading to S3: {future.exception()}")
 
-    def process_file_message(self, message):
-        """Processes a message from the file Kafka topic."""
-        if message["request_id"] != self.request_id:
-            print(f"Skipping message (wrong request_id): {message}")
-            return
-
-        zip_file_url = message["zip_file_url"]
-        partner_id = message["partner_id"]
-
-        try:
-            zip_file_path = self.download_file(zip_file_url)
-            extracted_files = self.extract_files(zip_file_path)
-            s3_file_paths = self.upload_to_s3(extracted_files)
-
-            for file_path in s3_file_paths:
-                self.publish_file_path(file_path, partner_id) # Uses request_id from constructor but includes PartnerID
-
-            self.update_workflow_topic("Files Downloaded, Extracted, and Uploaded")
-            self.log_status("Files processed successfully")
-
-        except Exception as e:
-            print(f"Error processing file: {e}")
-            self.log_status(f"Error processing file: {e}")
-            self.update_workflow_topic(f"File Processing Failed: {e}")
-
-    def download_file(self, zip_file_url):
-        """Mocks downloading the zip file."""
-        print(f"Downloading file from {zip_file_url}...")
-        # Simulate network issues
-        if random.random() < 0.1:  # 10% chance of failure
-            raise Exception("Network error during download")
-        time.sleep(1)  # Simulate download time
-        return "downloaded_data.zip"  # Mock path
-
-    def extract_files(self, zip_file_path):
-        """Mocks extracting JSON files from the zip file."""
-        print(f"Extracting files from {zip_file_path}...")
-        # Create a dummy zip file for testing
-        self.create_dummy_zip_file("downloaded_data.zip", num_files=3)  # Create on first call
-
-        extracted_files = []
-        try:
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                extracted_files = [f"extracted/{name}" for name in zip_ref.namelist()] # Simulate files
-
-            # Simulate errors
-            if random.random() < 0.05:  # 5% chance of corrupted zip
-                raise Exception("Corrupted zip file")
-
-            # Simulate files extracted successfully.
-            print(f"Extracted files: {extracted_files}")
-            return extracted_files
-        except zipfile.BadZipFile as e:
-            raise Exception(f"Error extracting zip file: {e}")
-
-    def create_dummy_zip_file(self, zip_file_name, num_files=3):
-        """Creates a dummy zip file with JSON files."""
-        if os.path.exists(zip_file_name): # Only create if it doesn't exist.
-            return  # File already exists
-
-        os.makedirs("extracted", exist_ok=True)  # Create directory
-        with zipfile.ZipFile(zip_file_name, 'w') as zip_file:
-            for i in range(num_files):
-                file_name = f"client_{i}.json"
-                file_path = os.path.join("extracted", file_name)
-                with open(file_path, 'w') as f:
-                    json.dump({"client_id": i, "account_balance": random.randint(1000, 100000)}, f)
-                zip_file.write(file_path, file_name)
-                os.remove(file_path)  # Clean up individual files
-
-    def upload_to_s3(self, file_paths):
-        """Mocks uploading files to S3."""
-        s3_file_paths = []
-        for file_path in file_paths:
-            s3_path = f"s3://{self.s3_bucket}/{file_path}"
-            print(f"Uploading {file_path} to {s3_path}...")
-            mock_s3[s3_path] = f"Contents of {file_path}"  # Simulate upload
-            s3_file_paths.append(s3_path)
-        return s3_file_paths
-
-    def publish_file_path(self, file_path, partner_id): # Uses request_id from constructor but includes PartnerID
-        """Mocks publishing a file path to the processing topic."""
+    def publish_file_path(self, file_path, partner_id, offsets=None):
+        """Mocks publishing a file path to the processing topic. offsets marks a newline-delimited chunk of clients."""
         message = {"file_path": file_path, "request_id": self.request_id, "partner_id": partner_id}
+        if offsets is not None:
+            message.update({"format": "ndjson", "offsets": offsets})
         json_filepath_topic.append(message)
         print(f"Published to json_filepath_topic: {message}")
 
-    def update_workflow_topic(self, status):   #Uses self.request_id, no request_id as a parameter
-        """Mocks updating the workflow Kafka topic."""
-        message = next((item for item in workflow_topic if item["request_id"] == self.request_id), None)
-        if message:
-            message["status"] = status
-            print(f"Updated workflow topic: {message}")
-
-    def log_status(self, message):  #Uses self.request_id, no request_id as a parameter
-        """Mocks logging to the observability Kafka topic."""
-        log_message = {
-            "module": "FileProcessor",
-            "request_id": self.request_id,
-            "timestamp": datetime.datetime.utcnow().isoformat(),
-            "message": message,
-        }
-        logging_topic.append(log_message)
-        print(f"Logged: {log_message}")
-
 #----------------------------------------------------------------------
-# 4. ETL Module (Updated)
+# ETL Module (Updated)
 #----------------------------------------------------------------------
-class ETLWorker:
-    def __init__(self, request_id): # Takes request_id
-        self.request_id = request_id # Tie component to a request_id
-        self.consumer_group = ETL_CONSUMER_GROUP # all workers from the same group.
+class ETLWorker(BaseETLWorker):
+    """ETLWorker that also reads the newline-delimited chunks of clients FileProcessor publishes."""
     def process_file(self, message):
-        """Processes a single JSON file."""
+        """Processes a single JSON file, or every client in a newline-delimited chunk of clients."""
         if message["request_id"] != self.request_id:
             print(f"Skipping message (wrong request_id): {message}")
             return
@@ -461,155 +279,54 @@ class ETLWorker:
         message_id = str(uuid.uuid4())
 
         try:
-            if self.is_processing(file_path):
+            if not self.claim_file(message_id, file_path):
                 print(f"File {file_path} is already being processed. Skipping.")
                 return
 
-            self.set_processing_status(message_id, file_path, "processing")
-
             file_contents = self.read_file(file_path)
-            data = json.loads(file_contents)
-            self.validate_data(data)
-            transformed_data = self.transform_data(data)
-            self.write_to_database(transformed_data, partner_id, message["request_id"])  # Pass request_id
+            if message.get("format") == "ndjson":
+                records = self.iter_chunk_records(file_contents, message["offsets"])
+            else:
+                records = [file_contents]
+
+            count = 0
+            errors = []
+            for position, record in enumerate(records):
+                try:
+                    data = json.loads(record)
+                    self.validate_data(data)
+                    transformed_data = self.transform_data(data)
+                    self.write_to_database(transformed_data, partner_id, message["request_id"])  # Pass request_id
+                    count += 1
+                except Exception as e:  # Keep going; writes are idempotent, so retrying the whole chunk is safe
+                    errors.append(f"client {position}: {e}")
+            if errors:
+                raise Exception(f"{len(errors)} of {len(errors) + count} clients failed ({'; '.join(errors[:3])})")
 
             self.set_processing_status(message_id, file_path, "completed")
-            self.update_workflow_topic(f"File {file_path} ETL Completed")
-            self.log_status(f"File {file_path} ETL completed")
+            self.update_workflow_topic(f"File {file_path} ETL Completed", partner_id)
+            self.log_status(f"File {file_path} ETL completed ({count} clients)")
 
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
             self.log_status(f"Error processing {file_path}: {e}")
             self.set_processing_status(message_id, file_path, "failed")
-            self.update_workflow_topic(f"File {file_path} ETL Failed: {e}")
-
-    def read_file(self, file_path):
-        """Mocks reading the file from S3."""
-        print(f"Reading file from {file_path}...")
-        # Simulate reading from S3
-        if file_path in mock_s3:
-            return mock_s3[file_path]
-        else:
-            raise Exception(f"File not found in S3: {file_path}")
-
-    def validate_data(self, data):
-        """Mocks validating the JSON data."""
-        print(f"Validating data: {data}...")
-        # Simulate schema validation, required fields, etc.
-        if not isinstance(data, dict) or "client_id" not in data or "account_balance" not in data:
-            raise ValueError("Invalid data format")
-
-    def transform_data(self, data):
-        """Mocks transforming the data."""
-        print(f"Transforming data: {data}...")
-        # Simulate data transformations (normalization, mapping, etc.)
-        transformed_data = {
-            "client_id": data["client_id"],
-            "account_balance": float(data["account_balance"]),
-            "processed_at": datetime.datetime.utcnow().isoformat(),
-        }
-        return transformed_data
-
-    def write_to_database(self, data, partner_id, request_id): # Added request_id as parameter
-        """Mocks writing data to the database."""
-        print(f"Writing data to database: {data} from Partner {partner_id}...")
-        # Simulate database insertion.  Implement Idempotency here.
-        client_id = data["client_id"]
-        # Simulate the unique constraint
-        unique_key = f"{request_id}-{partner_id}-{client_id}-{datetime.date.today()}" #unique_key is now request_id aware
-
-        # Check if this client's data for today has already been written
-        if unique_key in mock_db:
-            print(f"Data for client {client_id} from Partner {partner_id} on {datetime.date.today()} already exists. Skipping write.")
-            return  # Skip the write, maintaining idempotency
-
-        mock_db[unique_key] = data  # Store the data in the mock database
-        print(f"Data written for client {client_id} from Partner {partner_id}.")
-
-    def is_processing(self, file_path):
-        """Checks if the file is currently being processed - this needs to be done on database!! below is mock impl"""
-        for message_id, status in processing_status.items():
-            if status["file_path"] == file_path and status["status"] == "processing":
-                return True
-        return False
-
-    def set_processing_status(self, message_id, file_path, status):
-        """Mocks updating the processing status table. this needs to be done on database!! below is mock impl"""
-        processing_status[message_id] = {
-            "file_path": file_path,
-            "status": status,
-            "last_updated": datetime.datetime.utcnow().isoformat(),
-        }
-        print(f"Updated processing status for {file_path}: {status}")
-
-    def update_workflow_topic(self, status): #Uses self.request_id, no request_id as a parameter
-        """Mocks updating the workflow Kafka topic."""
-        message = next((item for item in workflow_topic if item["request_id"] == self.request_id), None)
-        if message:
-            message["status"] = status
-            print(f"Updated workflow topic: {message}")
-
-    def log_status(self, message): #Uses self.request_id, no request_id as a parameter
-        """Mocks logging to the observability Kafka topic."""
-        log_message = {
-            "module": "ETLWorker",
-            "request_id": self.request_id,
-            "timestamp": datetime.datetime.utcnow().isoformat(),
-            "message": message,
-        }
-        logging_topic.append(log_message)
-        print(f"Logged: {log_message}")
+            self.update_workflow_topic(f"File {file_path} ETL Failed: {e}", partner_id)
+
+    def iter_chunk_records(self, file_contents, offsets):
+        """Yields each client's JSON from a newline-delimited chunk, sliced by the chunk's offset index."""
+        if isinstance(file_contents, str):
+            file_contents = file_contents.encode("utf-8")
+        if len(file_contents) != offsets[-1]:
+            raise ValueError(f"Chunk is {len(file_contents)} bytes but its offset index expects {offsets[-1]}")
+        view = memoryview(file_contents)
+        for start, end in zip(offsets, offsets[1:]):
+            yield view[start:end].tobytes()
 
 #----------------------------------------------------------------------
-# 5. Monitoring, Logging & Alerting Module (No Changes)
-#----------------------------------------------------------------------
-class Monitor:
-    def __init__(self, error_threshold=3, request_id = None):
-        self.error_threshold = error_threshold
-        self.error_count = 0
-        self.request_id = request_id
-
-    def check_logs(self):
-      """Simulates checking logs for errors and anomalies."""
-      # Only check logs related to the current request_id
-      errors = [log for log in logging_topic if "Error" in log["message"] and log["request_id"] == self.request_id]
-
-      if errors:
-          self.error_count += len(errors)
-          print(f"Found {len(errors)} errors in logs (request_id: {self.request_id}).")
-          for error in errors:
-              print(f"  - {error}")
-      else:
-          print(f"No errors found in logs for request_id: {self.request_id}.")
-
-      if self.error_count > self.error_threshold:
-          self.trigger_alert(f"Error count exceeded threshold ({self.error_threshold})")
-          self.error_count = 0  # Reset counter after alerting.
-
-    def check_workflow(self):
-        """Simulates checking the workflow topic for stalled processes."""
-        incomplete_workflows = [
-            item for item in workflow_topic if item["status"] != "Files Downloaded, Extracted, and Uploaded" and item["status"] != "File Processing Completed"  and item["request_id"] == self.request_id
-        ]
-        if incomplete_workflows:
-            print(f"Found {len(incomplete_workflows)} incomplete workflows for request_id: {self.request_id}.")
-            for workflow in incomplete_workflows:
-                print(f"  - Request ID: {workflow['request_id']}, Status: {workflow['status']}")
-                #Potentially trigger alerts for stalled workflows.
-        else:
-            print(f"No incomplete workflows found for request_id: {self.request_id}.")
-
-    def trigger_alert(self, message):
-        """Mocks triggering an alert (e.g., sending an email or Slack message)."""
-        print(f"ALERT: {message}")
-        # In a real system, you would send an email, Slack notification, etc.
-        # using libraries like `smtplib` or `slack_sdk`.
-#----------------------------------------------------------------------
 # Main Execution
 #----------------------------------------------------------------------
 
-# Mock database (in-memory)
-mock_db = {}
 
 def main():
     #1.  Initialization
@@ -619,9 +336,17 @@ def main():
     # Pass request_id to all components
     scheduler = Scheduler(partner_api_url, request_id)
     webhook_listener = WebhookListener(request_id)
-    file_processor = FileProcessor(request_id=request_id)
-    etl_worker = ETLWorker(request_id)
+    file_processor = FileProcessor(request_id=request_id, s3_client=FakeS3Client(mock_s3))  # Local S3 stand-in backed by mock_s3
     monitor = Monitor(request_id=request_id)
+    zip_consumer = TopicConsumer(zip_filepath_topic, "FileProcessors")
+    # Run ETL_WORKERS ETL workers as one consumer group over the json_filepath_topic partitions.
+    # Each ETLWorker skips messages that belong to another request ID. The group subscribes (and
+    # starts consuming) before any file is produced: json_filepath_topic is a work queue, so a
+    # FileProcessor that gets ahead of the workers waits for them rather than dropping files.
+    etl_group = ConsumerGroup(ETL_CONSUMER_GROUP, json_filepath_topic,
+                              worker_factory=lambda: ETLWorker(request_id),
+                              handler=ETLWorker.process_file,
+                              num_workers=ETL_WORKERS)
 
     # Set up the scheduler thread
     scheduler_thread = threading.Thread(target=scheduler.schedule_daily_request, daemon=True)
@@ -642,31 +367,16 @@ def main():
     # Simulate file processing after another delay
     time.sleep(5)
 
-    #Filter zip filepath topic messages to process
-    filtered_zip_filepath_topic = [msg for msg in zip_filepath_topic if msg["request_id"] == request_id]
-
-    if filtered_zip_filepath_topic:
-        file_message = filtered_zip_filepath_topic.pop(0)  # Get the first message from the file topic
-        file_processor.process_file_message(file_message)
-
-    # Simulate ETL processing after another delay
-    time.sleep(5)
-
-   # Ensure ETL Worker only picks up the work for this request ID
-    filtered_json_filepath_topic = [msg for msg in json_filepath_topic if msg["request_id"] == request_id]
-
-    # Simulate ETL processing after another delay
-    time.sleep(5)
-    # Ensure ETL Worker only picks up the work for this request ID
-
-    #For a Consumer Group implementation you would need to make your python threads aware
-    # that they all belong to same Consumer Group
-    #This involves using a librar such as confluent-kafka to spin threads
-
-    # Simulate multiple ETL workers in the same consumer group:
-    for _ in range(len(filtered_json_filepath_topic)):
-        file_message = filtered_json_filepath_topic.pop(0)
-        etl_worker.process_file(file_message)
+    # Consume the zip file messages; FileProcessor skips messages that belong to another request ID.
+    # The ETL group processes the files as they are published.
+    etl_group.start()
+    try:
+        for file_message in zip_consumer.drain():
+            file_processor.process_file_message(file_message)
+        etl_group.wait_until_drained()
+    finally:
+        etl_group.stop()
+    print(f"ETL consumer group processed: {etl_group.processed}")
 
 
     # Simulate monitoring after processing
@@ -674,6 +384,8 @@ def main():
     print("\n--- Monitoring ---\n")
     monitor.check_logs()
     monitor.check_workflow()
+    monitor.check_stalled_workflows()
+    monitor.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import contextlib
+import datetime
+import io
+import unittest
+from mock_infra import (COMPLETED_WORKFLOW_STATUSES, COMPLETED_WORKFLOW_STATUS_SUFFIXES, ConsumerGroup,
+                        PartitionedTopic, Scheduler, TopicConsumer, WorkflowStateStore, workflow_state)
+
+
+class PartitionedTopicTest(unittest.TestCase):
+
+    def test_work_queue_blocks_instead_of_dropping(self):
+        topic = PartitionedTopic("json_filepath_topic", num_partitions=2, capacity=100, producer_timeout=0.05)
+        topic.subscribe("ETL")
+        with self.assertRaises(TimeoutError):
+            for index in range(1000):
+                topic.append(index)
+        self.assertEqual(len(topic), 200)
+        self.assertEqual(topic.lag("ETL"), 200)
+
+    def test_work_queue_delivers_everything_to_a_running_group(self):
+        topic = PartitionedTopic("json_filepath_topic", num_partitions=2, capacity=100)
+        seen = []
+        group = ConsumerGroup("ETL", topic, worker_factory=lambda: None,
+                              handler=lambda worker, message: seen.append(message), num_workers=2)
+        group.start()
+        try:
+            for index in range(1000):
+                topic.append(index)
+            group.wait_until_drained(timeout=30)
+        finally:
+            group.stop()
+        self.assertEqual(sorted(seen), list(range(1000)))
+        self.assertEqual(len(topic), 0)
+
+    def test_unsubscribed_group_releases_producers(self):
+        topic = PartitionedTopic("zip_filepath_topic", num_partitions=1, capacity=10, producer_timeout=0.05)
+        topic.subscribe("FileProcessors")
+        topic.subscribe("Abandoned")
+        for index in range(10):
+            topic.append(index)
+        topic.commit("FileProcessors", 0, 10)
+        topic.unsubscribe("Abandoned")
+        topic.append(10)
+        self.assertEqual(len(topic), 1)
+
+    def test_log_never_blocks_and_counts_missed_messages(self):
+        topic = PartitionedTopic("logging_topic", num_partitions=1, capacity=100, backpressure=False)
+        consumer = TopicConsumer(topic, "Monitor")
+        for index in range(1000):
+            topic.append(index)
+        self.assertEqual(len(topic), 100)
+        self.assertEqual(topic.missed_messages("Monitor"), 900)
+        self.assertEqual(list(consumer.drain()), list(range(900, 1000)))
+        consumer.close()
+        for index in range(1000):
+            topic.append(index)  # No group left, so nothing is missed
+        self.assertEqual(topic.missed_messages("Monitor"), 0)
+
+    def test_log_expires_by_age(self):
+        now = [0.0]
+        topic = PartitionedTopic("workflow_topic", num_partitions=1, backpressure=False, retention_seconds=60,
+                                 clock=lambda: now[0])
+        topic.append("old")
+        now[0] = 30.0
+        topic.append("new")
+        now[0] = 61.0
+        self.assertEqual(topic.read(0, 0), ["new"])
+
+
+class WorkflowStateStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.store = WorkflowStateStore(terminal_statuses=COMPLETED_WORKFLOW_STATUSES,
+                                        terminal_suffixes=COMPLETED_WORKFLOW_STATUS_SUFFIXES,
+                                        clock=lambda: self.now)
+
+    def run_request(self, request_id, *statuses):
+        for status in statuses:
+            self.store.transition(request_id, status, partner_id="partner1")
+            self.now += 1.0
+
+    def test_completed_request_is_never_stalled(self):
+        self.run_request("r1", "Request Initiated", "Webhook Received", "Files Downloaded, Extracted, and Uploaded",
+                         "File data/r1/clients.json ETL Started", "File data/r1/clients.json ETL Completed")
+        self.assertTrue(self.store.is_terminal("File data/r1/clients.json ETL Completed"))
+        self.now += 10 ** 6
+        self.assertEqual(self.store.stalled(older_than=60), [])
+
+    def test_stuck_request_is_stalled(self):
+        self.run_request("r1", "Request Initiated", "File data/r1/clients.json ETL Completed")
+        self.run_request("r2", "Request Initiated", "Webhook Received")
+        self.now += 120
+        self.assertEqual([state["request_id"] for state in self.store.stalled(older_than=60)], ["r2"])
+
+    def test_failed_etl_is_not_terminal(self):
+        self.run_request("r1", "File data/r1/clients.json ETL Failed: bad JSON")
+        self.now += 120
+        self.assertEqual([state["request_id"] for state in self.store.stalled(older_than=60)], ["r1"])
+
+    def test_new_status_after_completion_is_tracked_again(self):
+        self.run_request("r1", "File a.json ETL Completed", "File b.json ETL Started")
+        self.now += 120
+        self.assertEqual([state["request_id"] for state in self.store.stalled(older_than=60)], ["r1"])
+
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def test_each_run_gets_its_own_request_id(self):
+        accepted = []
+        last_run = datetime.datetime(2024, 3, 1, 16, tzinfo=datetime.timezone.utc)
+        scheduler = Scheduler("https://partner.example/api/request_accounts", "r1", last_run=last_run,
+                              on_request=lambda request_id, partner_id: accepted.append(request_id))
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = scheduler.run_daily_request(last_run + datetime.timedelta(days=1))
+            second = scheduler.run_daily_request(last_run + datetime.timedelta(days=2))
+        self.assertEqual(first, "r1")  # The supplied request_id is used even when resuming from a last_run
+        self.assertNotEqual(second, "r1")
+        self.assertEqual(accepted, [first, second])
+        self.assertEqual(scheduler.request_id, "r1")
+        self.assertEqual(scheduler.last_run, last_run + datetime.timedelta(days=2))
+        self.assertEqual(workflow_state.get(second)["status"], "Request Initiated")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -139,6 +139,16 @@ BEGIN
     END IF;
 END $$;
 
+-- One claim row per file, so ETL workers can atomically claim a file_path (Idempotent)
+CREATE UNIQUE INDEX IF NOT EXISTS file_processing_status_file_path_idx
+    ON financial_data.File_Processing_Status (file_path);
+
+-- Read-side indexes for the holdings API: a client's accounts, then keyset pages of each partner/data_date's holdings (Idempotent)
+CREATE INDEX IF NOT EXISTS accounts_client_idx
+    ON financial_data.Accounts (client_id, partner_id, data_date);
+CREATE INDEX IF NOT EXISTS holdings_account_keyset_idx
+    ON financial_data.Holdings (partner_id, data_date, account_id, holding_id);
+
 -- Composite Type for Clients (Idempotent)
 DO $$
 BEGIN
@@ -0,0 +1,519 @@
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import json
+import multiprocessing
+import os
+import pickle
+import resource
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from array import array
+import json_decoder_FP
+from json_decoder_FP import (Client, ColumnRule, DEPOSITORY_SWEEP_RULE, HoldingRuleEngine, HoldingsTable,
+                             JsonDecoder, TransformHolding, available_backends)
+from pricing_FP import FakePriceProvider, PriceCache, PricingService
+from holdings_encoder_FP import holdings_to_json, stream_holdings_json
+from response_cache_FP import ResponseCache
+
+
+def make_client_data(index: int, holdings: int = 20, transactions: int = 50, days: int = 28) -> dict:
+    """Builds a synthetic partner client record shaped like the partner JSON payloads, with trades spread over `days` days."""
+    account_ids = [f"a_{index}_{n}" for n in range(2)]
+    first_day = datetime.date(2024, 4, 1)
+    return {
+        "id": f"c_{index}",
+        "name": f"Client {index}",
+        "accounts": [
+            {"id": account_id, "value": "12098", "currency": "USD", "name": "Brokerage", "type": "Brokerage"}
+            for account_id in account_ids
+        ],
+        "holdings": [
+            {
+                "id": f"h_{index}_{n}",
+                "accountId": account_ids[n % 2],
+                "name": "Depository Sweep" if n % 10 == 0 else f"Security {n}",
+                "security": None if n % 10 == 0 else f"SEC{n}",
+                "quantity": 14.5 + n,
+                "buyPrice": 1 if n % 10 == 0 else 145,
+                "isCashLike": n % 10 == 0,
+            }
+            for n in range(holdings)
+        ],
+        "transactions": [
+            {
+                "id": f"t_{index}_{n}",
+                "accountId": account_ids[n % 2],
+                "holdingId": f"h_{index}_{n % holdings}" if holdings else None,
+                "type": "BUY" if n % 2 else "SELL",
+                "quantity": 2,
+                "value": 167,
+                "date": (first_day + datetime.timedelta(days=n % days)).isoformat(),
+                "settleDate": (first_day + datetime.timedelta(days=n % days + 2)).isoformat(),
+            }
+            for n in range(transactions)
+        ],
+    }
+
+
+def write_partner_file(path: str, num_clients: int) -> None:
+    """Writes a partner file (a top-level JSON array of clients) without holding it all in memory."""
+    with open(path, "w") as f:
+        f.write("[")
+        for index in range(num_clients):
+            if index:
+                f.write(",\n")
+            json.dump(make_client_data(index), f)
+        f.write("]")
+
+
+def _decode_in_child(mode: str, path: str, results) -> None:
+    """Runs one decode mode in a fresh process so peak RSS reflects only that mode."""
+    start = time.perf_counter()
+    count = 0
+    if mode == "load":
+        with open(path) as f:
+            data = json.load(f)
+        clients = [Client.from_dict(item) for item in data]
+        count = len(clients)
+    else:
+        with open(path, "rb") as f:
+            for _ in JsonDecoder.iter_clients(f):
+                count += 1
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024  # macOS reports bytes
+    results.put((count, elapsed, peak_kb))
+
+
+def bench_decode(num_clients: int) -> None:
+    """Compares peak RSS and throughput of whole-file decoding against JsonDecoder.iter_clients."""
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "partner_clients.json")
+        write_partner_file(path, num_clients)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"Partner file: {num_clients} clients, {size_mb:.1f} MB")
+
+        for mode, label in (("load", "json.load + from_dict"), ("stream", "iter_clients")):
+            results = ctx.Queue()
+            process = ctx.Process(target=_decode_in_child, args=(mode, path, results))
+            process.start()
+            count, elapsed, peak_kb = results.get()
+            process.join()
+            print(f"{label:>24}: {count / elapsed:10.0f} clients/sec, peak RSS {peak_kb / 1024:8.1f} MB")
+
+
+def bench_memory(num_holdings: int, num_transactions: int) -> None:
+    """Compares the retained memory of a large client as lists of dataclasses vs columnar tables."""
+    data = make_client_data(0, holdings=num_holdings, transactions=num_transactions)
+    print(f"One client: {num_holdings} holdings, {num_transactions} transactions")
+
+    for columnar, label in ((False, "list of dataclasses"), (True, "columnar tables")):
+        tracemalloc.start()
+        client = Client.from_dict(data, columnar=columnar)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows = len(client.holdings) + len(client.transactions)
+        print(f"{label:>20}: {retained / (1024 * 1024):8.1f} MB retained, {retained / rows:6.0f} bytes/row")
+        del client
+
+
+def make_holdings_table(num_rows: int, distinct_names: int = 1000) -> HoldingsTable:
+    """Builds a large HoldingsTable directly from repeated columns; one row in distinct_names is a Depository Sweep."""
+    table = HoldingsTable()
+    table.pool.add("Depository Sweep")  # Code 0
+    for n in range(1, distinct_names):
+        table.pool.add(f"Security {n}")
+    repeats, remainder = divmod(num_rows, distinct_names)
+
+    def column(typecode, pattern):
+        return array(typecode, pattern) * repeats + array(typecode, pattern[:remainder])
+
+    table.holding_id = ["h"] * num_rows  # Untouched by the transform, so one shared string keeps setup small
+    table.account_id = column("i", [0] * distinct_names)
+    table.name = column("i", list(range(distinct_names)))
+    table.security = column("i", [-1] + list(range(1, distinct_names)))
+    table.quantity = column("d", [14.5] * distinct_names)
+    table.buy_price = column("d", [1.0] + [145.0] * (distinct_names - 1))
+    table.is_cash_like = column("b", [1] + [0] * (distinct_names - 1))
+    return table
+
+
+def bench_transform(num_rows: int, list_rows: int) -> None:
+    """Compares per-Holding TransformHolding against the column-wise rule engine on a HoldingsTable."""
+    table = make_holdings_table(num_rows)
+    print(f"HoldingsTable: {num_rows} rows ({num_rows // 1000} Depository Sweeps)")
+
+    holdings = list(make_holdings_table(list_rows))  # A list of dataclasses this large would not fit in memory at num_rows
+    start = time.perf_counter()
+    TransformHolding.update_holdings(holdings)
+    elapsed = time.perf_counter() - start
+    print(f"{'per-Holding (list)':>26}: {list_rows / elapsed / 1e6:8.2f}M rows/sec ({list_rows} rows)")
+    del holdings
+
+    numpy_module = json_decoder_FP.numpy
+    backends = [("column-wise (pure Python)", None)] + ([("column-wise (NumPy)", numpy_module)] if numpy_module else [])
+    for label, backend in backends:
+        json_decoder_FP.numpy = backend
+        start = time.perf_counter()
+        updated = TransformHolding.update_holdings(table)
+        elapsed = time.perf_counter() - start
+        shared = sum(getattr(updated, name) is getattr(table, name) for name in HoldingsTable.__slots__)
+        print(f"{label:>26}: {num_rows / elapsed / 1e6:8.2f}M rows/sec, "
+              f"{shared}/{len(HoldingsTable.__slots__)} columns shared with the input")
+    json_decoder_FP.numpy = numpy_module
+
+
+def bench_rules(rule_counts, num_holdings: int) -> None:
+    """Shows per-holding rule cost staying flat as the compiled rule set grows."""
+    holdings = [h for index in range(num_holdings // 20) for h in Client.from_dict(make_client_data(index)).holdings]
+    table = HoldingsTable()
+    for holding in holdings:
+        table.append(holding)
+    print(f"{len(holdings)} holdings")
+
+    for count in rule_counts:
+        # Partner-style renames keyed on name, each with a residual predicate. Only the Depository Sweep
+        # rule and "Security 1" match, so every rule count transforms the same holdings.
+        rules = [DEPOSITORY_SWEEP_RULE] + [
+            ColumnRule(name=f"rename {n}", when={"name": f"Security {n}" if n == 1 else f"Partner Security {n}",
+                                                  "is_cash_like": False},
+                       assign={"name": f"Renamed {n}"})
+            for n in range(1, count)
+        ]
+        engine = HoldingRuleEngine(rules)
+        start = time.perf_counter()
+        for holding in holdings:
+            engine.apply_row(holding)
+        row_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        engine.apply(table)
+        table_elapsed = time.perf_counter() - start
+        print(f"{count:>6} rules: {row_elapsed / len(holdings) * 1e9:7.0f} ns/holding per-Holding, "
+              f"{table_elapsed / len(holdings) * 1e9:7.0f} ns/holding column-wise")
+
+
+# name -> (holdings, transactions, days of trading history)
+FROM_DICT_PAYLOADS = {
+    "typical": (20, 50, 28),
+    "active-trader": (50, 2_000, 365),
+    "long-history": (200, 20_000, 3_650),
+}
+
+
+def _strptime_date(date_str: str) -> datetime.date:
+    """The pre-fast-path Transaction date parsing, for comparison."""
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
+
+def bench_from_dict(repeat: int) -> None:
+    """Micro-benchmarks Client.from_dict on transaction-heavy payloads, strptime vs the memoised fromisoformat path."""
+    fast_parse_date = json_decoder_FP.parse_date
+    for payload, (holdings, transactions, days) in FROM_DICT_PAYLOADS.items():
+        data = make_client_data(0, holdings=holdings, transactions=transactions, days=days)
+        number = max(1, 20_000 // transactions)
+        results = []
+        for label, parse_date in (("strptime", _strptime_date), ("fromisoformat+memo", fast_parse_date)):
+            json_decoder_FP.parse_date = parse_date
+            best = min(timeit.repeat(lambda: Client.from_dict(data), number=number, repeat=repeat)) / number
+            results.append(best)
+            print(f"{payload:>14} ({holdings:>3} holdings, {transactions:>6} transactions) {label:>19}: "
+                  f"{best * 1000:9.3f} ms/client, {transactions / best / 1e6:5.2f}M transactions/sec")
+        json_decoder_FP.parse_date = fast_parse_date
+        print(f"{'':>14} speedup {results[0] / results[1]:.1f}x")
+
+
+def bench_backends(num_clients: int, repeat: int) -> None:
+    """Compares the installed JsonDecoder backends on the same partner payload bytes."""
+    payload = json.dumps([make_client_data(index) for index in range(num_clients)]).encode("utf-8")
+    single = json.dumps(make_client_data(0, transactions=2_000, days=365)).encode("utf-8")
+    print(f"Payload: {num_clients} clients, {len(payload) / (1024 * 1024):.1f} MB; "
+          f"single client: {len(single) / 1024:.0f} KB")
+
+    baseline = None
+    for name, backend in available_backends().items():
+        many = min(timeit.repeat(lambda: backend.decode_clients(payload), number=1, repeat=repeat))
+        one = min(timeit.repeat(lambda: backend.decode_client(single), number=10, repeat=repeat)) / 10
+        baseline = baseline or many
+        print(f"{name:>8}: {num_clients / many:9.0f} clients/sec ({baseline / many:4.1f}x), "
+              f"{one * 1000:7.2f} ms per 2000-transaction client")
+
+
+def bench_parallel(num_clients: int, worker_counts, chunk_mb: float) -> None:
+    """Compares serial iter_clients with JsonDecoder.decode_many_parallel, and the pickled size of a client."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "partner_clients.json")
+        write_partner_file(path, num_clients)
+        print(f"Partner file: {num_clients} clients, {os.path.getsize(path) / (1024 * 1024):.1f} MB, "
+              f"{os.cpu_count()} CPUs")
+
+        sizes = [len(pickle.dumps(Client.from_dict(make_client_data(0), columnar=columnar), pickle.HIGHEST_PROTOCOL))
+                 for columnar in (False, True)]
+        print(f"Pickled client: {sizes[0]} bytes, {sizes[1]} bytes columnar")
+
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            count = sum(1 for _ in JsonDecoder.iter_clients(f))
+        serial = time.perf_counter() - start
+        print(f"{'serial iter_clients':>28}: {count / serial:8.0f} clients/sec")
+
+        for columnar in (False, True):
+            for workers in worker_counts:
+                start = time.perf_counter()
+                count = sum(1 for _ in JsonDecoder.decode_many_parallel([path], workers=workers, columnar=columnar,
+                                                                        chunk_bytes=int(chunk_mb * 1024 * 1024)))
+                elapsed = time.perf_counter() - start
+                label = f"{workers} workers{' (columnar)' if columnar else ''}"
+                print(f"{label:>28}: {count / elapsed:8.0f} clients/sec ({serial / elapsed:4.1f}x)")
+
+
+def bench_pricing(num_holdings: int, num_symbols: int, latency: float) -> None:
+    """Compares one provider call per holding with the batched, cached PricingService."""
+    holdings = [h for index in range(num_holdings // 20 + 1) for h in Client.from_dict(make_client_data(index)).holdings]
+    holdings = holdings[:num_holdings]
+    securities = [f"SYM{n % num_symbols}" if h.security is not None else None for n, h in enumerate(holdings)]
+    print(f"{len(holdings)} holdings over {num_symbols} symbols, {latency * 1000:.0f}ms per provider call")
+
+    provider = FakePriceProvider(latency=latency)
+    start = time.perf_counter()
+    for security in securities:
+        if security is not None:
+            provider.get_price(security)
+    elapsed = time.perf_counter() - start
+    print(f"{'per-holding getPrice':>22}: {elapsed * 1000:9.1f} ms, {provider.calls} provider calls")
+
+    provider = FakePriceProvider(latency=latency)
+    service = PricingService(provider, PriceCache(ttl=60, max_size=10000))
+    for label in ("batched (cold cache)", "batched (warm cache)"):
+        start = time.perf_counter()
+        service.get_prices(securities)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>22}: {elapsed * 1000:9.1f} ms, {provider.calls} provider calls so far")
+    print(f"Metrics: {service.metrics()}")
+
+
+def bench_async_pricing(num_holdings: int, latency: float, concurrency: int, deadline: float,
+                        num_requests: int, tail_latency: float, tail_probability: float) -> None:
+    """Load-tests concurrent, deadline-bounded price fetching against a slow one-symbol-per-call backend."""
+    print(f"{num_holdings} distinct securities per client, {latency * 1000:.0f}ms per provider call "
+          f"({tail_probability:.0%} of calls take {tail_latency * 1000:.0f}ms), deadline {deadline * 1000:.0f}ms")
+
+    sample = min(num_holdings, 20)
+    service = PricingService(FakePriceProvider(latency=latency, max_batch=1))
+    start = time.perf_counter()
+    service.get_prices(f"SERIAL{n}" for n in range(sample))
+    serial = (time.perf_counter() - start) / sample * num_holdings
+    print(f"{'serial getPrice':>30}: {serial * 1000:9.0f} ms per client (extrapolated from {sample} symbols)")
+
+    async def one_request(service, index):
+        start = time.perf_counter()
+        _, unpriced = await service.get_prices_async((f"C{index}_{n}" for n in range(num_holdings)), timeout=deadline)
+        return time.perf_counter() - start, len(unpriced)
+
+    async def load_test():
+        provider = FakePriceProvider(latency=latency, max_batch=1, tail_latency=tail_latency,
+                                     tail_probability=tail_probability)
+        service = PricingService(provider, max_concurrency=concurrency)
+        single, unpriced = await one_request(service, -1)
+        print(f"{'async, one request':>30}: {single * 1000:9.0f} ms, {unpriced} unpriced")
+
+        results = await asyncio.gather(*(one_request(service, index) for index in range(num_requests)))
+        latencies = sorted(elapsed for elapsed, _ in results)
+        partial = sum(1 for _, unpriced in results if unpriced)
+        print(f"{f'async, {num_requests} concurrent requests':>30}: p50 {latencies[len(latencies) // 2] * 1000:6.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.0f} ms, {partial} partial responses")
+        print(f"Metrics: {service.metrics()}")
+
+    asyncio.run(load_test())
+
+
+def bench_encode(num_holdings: int, seconds: float) -> None:
+    """Responses/sec serializing one client's priced holdings: asdict + json.dumps vs holdings_to_json."""
+    data = make_client_data(0, holdings=num_holdings, transactions=0)
+    holdings = Client.from_dict(data).holdings
+    table = Client.from_dict(data, columnar=True).holdings
+    prices = {h.security: FakePriceProvider.price_of(h.security) for h in holdings if h.security is not None}
+    print(f"One client with {num_holdings} holdings")
+
+    def asdict_path():
+        return json.dumps([dict(dataclasses.asdict(h), currentPrice=prices.get(h.security)) for h in holdings]).encode()
+
+    expected = asdict_path()
+    for label, render in (("asdict + json.dumps", asdict_path),
+                          ("holdings_to_json (list)", lambda: holdings_to_json(holdings, prices)),
+                          ("holdings_to_json (table)", lambda: holdings_to_json(table, prices))):
+        assert render() == expected
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            render()
+            count += 1
+        elapsed = time.perf_counter() - start
+        print(f"{label:>26}: {count / elapsed:8.1f} responses/sec")
+
+
+def bench_response_cache(num_clients: int, num_holdings: int, polls: int, tick_every: int) -> None:
+    """
+    Dashboard polling against /holdings_with_price's render path: every poll re-renders, vs the
+    ResponseCache with conditional GETs (304s), with a price tick moving one quote every tick_every polls.
+    """
+    clients = [Client.from_dict(make_client_data(index, holdings=num_holdings, transactions=0), columnar=True)
+               for index in range(num_clients)]
+    securities = {client.client_id: {client.holdings.pool.get(code) for code in client.holdings.security}
+                  for client in clients}
+    symbols = sorted(set().union(*securities.values()) - {None})
+    print(f"{num_clients} clients x {num_holdings} holdings, {polls} polls, a price tick every {tick_every} polls")
+
+    for label, cached in (("no cache", False), ("response cache", True)):
+        pricing = PricingService(FakePriceProvider(latency=0.0))
+        responses = ResponseCache(max_entries=num_clients * 2, max_age=pricing.cache.ttl)
+        etags = {}  # What each polling dashboard last received
+        not_modified = 0
+        start = time.perf_counter()
+        for poll in range(polls):
+            if poll and poll % tick_every == 0:
+                symbol = symbols[poll % len(symbols)]
+                if pricing.apply_price_tick({symbol: pricing.get_price(symbol) + 0.01}):
+                    responses.invalidate()
+            client = clients[poll % num_clients]
+
+            def render(holdings=client.holdings, client_securities=securities[client.client_id]):
+                return holdings_to_json(holdings, pricing.get_prices(client_securities))
+
+            if not cached:
+                render()
+                continue
+            entry = responses.get_or_render(lambda: (client.client_id, None, pricing.version), render)
+            if responses.matches(entry, {etags.get(client.client_id)}):
+                not_modified += 1
+            etags[client.client_id] = entry.etag
+        elapsed = time.perf_counter() - start
+        print(f"{label:>15}: {polls / elapsed:9.1f} responses/sec")
+    metrics = responses.metrics()
+    print(f"response cache hit ratio {metrics['hit_ratio']:.1%}, {not_modified / polls:.1%} of polls answered 304")
+
+
+def bench_stream(sizes, latency: float, chunk_size: int) -> None:
+    """
+    Time to first byte, time to the first holding, total time and peak memory for one client's priced
+    holdings: rendered whole (holdings_to_json) vs streamed (stream_holdings_json), with a cold price
+    cache whose provider call costs `latency` seconds.
+    """
+    print(f"{'holdings':>9} {'mode':>9} {'first byte':>11} {'first row':>10} {'total':>9} {'peak MiB':>9}")
+    for size in sizes:
+        table = Client.from_dict(make_client_data(0, holdings=size, transactions=0), columnar=True).holdings
+        for mode in ("buffered", "streamed"):
+            pricing = PricingService(FakePriceProvider(latency=latency))
+            tracemalloc.start()
+            start = time.perf_counter()
+            if mode == "buffered":
+                chunks = iter([holdings_to_json(table, pricing.get_prices(table.pool.get(code) for code in table.security))])
+            else:
+                chunks = stream_holdings_json(table, pricing.get_prices, chunk_size)
+            first_byte = first_row = None
+            size_bytes = 0
+            for chunk in chunks:
+                now = time.perf_counter() - start
+                first_byte = now if first_byte is None else first_byte
+                if first_row is None and len(chunk) > 2:
+                    first_row = now
+                size_bytes += len(chunk)  # Each chunk is dropped once "sent"
+            total = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>9} {mode:>9} {first_byte * 1000:>9.1f}ms {first_row * 1000:>8.1f}ms "
+                  f"{total * 1000:>7.1f}ms {peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the FPCodeTask3 decoding and enhancement paths.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    decode_parser = subparsers.add_parser("decode", help="Peak RSS and throughput of decode vs iter_clients")
+    decode_parser.add_argument("--clients", type=int, default=20000)
+
+    memory_parser = subparsers.add_parser("memory", help="Memory of list-of-dataclasses vs columnar holdings/transactions")
+    memory_parser.add_argument("--holdings", type=int, default=10000)
+    memory_parser.add_argument("--transactions", type=int, default=100000)
+
+    transform_parser = subparsers.add_parser("transform", help="Per-Holding vs column-wise TransformHolding rows/sec")
+    transform_parser.add_argument("--rows", type=int, default=10_000_000)
+    transform_parser.add_argument("--list-rows", type=int, default=500_000)
+
+    rules_parser = subparsers.add_parser("rules", help="Per-holding cost of the compiled rule set vs rule count")
+    rules_parser.add_argument("--rules", type=int, nargs="+", default=[1, 10, 100, 1000])
+    rules_parser.add_argument("--holdings", type=int, default=200_000)
+
+    from_dict_parser = subparsers.add_parser("from-dict", help="Client.from_dict micro-benchmarks on transaction-heavy payloads")
+    from_dict_parser.add_argument("--repeat", type=int, default=5)
+
+    backends_parser = subparsers.add_parser("backends", help="Compare the installed JsonDecoder backends")
+    backends_parser.add_argument("--clients", type=int, default=2000)
+    backends_parser.add_argument("--repeat", type=int, default=3)
+
+    parallel_parser = subparsers.add_parser("parallel", help="decode_many_parallel clients/sec vs serial decoding")
+    parallel_parser.add_argument("--clients", type=int, default=20000)
+    parallel_parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16, 32])
+    parallel_parser.add_argument("--chunk-mb", type=float, default=8)
+
+    pricing_parser = subparsers.add_parser("pricing", help="Per-holding pricing vs the batched, cached PricingService")
+    pricing_parser.add_argument("--holdings", type=int, default=2000)
+    pricing_parser.add_argument("--symbols", type=int, default=200)
+    pricing_parser.add_argument("--latency", type=float, default=0.002)
+
+    async_parser = subparsers.add_parser("async-pricing", help="Load test of deadline-bounded concurrent price fetching")
+    async_parser.add_argument("--holdings", type=int, default=500)
+    async_parser.add_argument("--latency", type=float, default=0.05)
+    async_parser.add_argument("--concurrency", type=int, default=64)
+    async_parser.add_argument("--deadline", type=float, default=1.0)
+    async_parser.add_argument("--requests", type=int, default=20)
+    async_parser.add_argument("--tail-latency", type=float, default=2.0)
+    async_parser.add_argument("--tail-probability", type=float, default=0.01)
+
+    encode_parser = subparsers.add_parser("encode", help="Responses/sec for priced holdings JSON")
+    encode_parser.add_argument("--holdings", type=int, default=10000)
+    encode_parser.add_argument("--seconds", type=float, default=3)
+
+    response_cache_parser = subparsers.add_parser("response-cache", help="Polling /holdings_with_price with and without the response cache")
+    response_cache_parser.add_argument("--clients", type=int, default=100)
+    response_cache_parser.add_argument("--holdings", type=int, default=1000)
+    response_cache_parser.add_argument("--polls", type=int, default=5000)
+    response_cache_parser.add_argument("--tick-every", type=int, default=500)
+
+    stream_parser = subparsers.add_parser("stream", help="TTFB and peak memory of buffered vs streamed priced holdings")
+    stream_parser.add_argument("--holdings", type=int, nargs="+", default=[1000, 10000, 100000])
+    stream_parser.add_argument("--latency", type=float, default=0.005)
+    stream_parser.add_argument("--chunk-size", type=int, default=1000)
+
+    args = parser.parse_args()
+    if args.benchmark == "decode":
+        bench_decode(args.clients)
+    elif args.benchmark == "memory":
+        bench_memory(args.holdings, args.transactions)
+    elif args.benchmark == "transform":
+        bench_transform(args.rows, args.list_rows)
+    elif args.benchmark == "rules":
+        bench_rules(args.rules, args.holdings)
+    elif args.benchmark == "from-dict":
+        bench_from_dict(args.repeat)
+    elif args.benchmark == "backends":
+        bench_backends(args.clients, args.repeat)
+    elif args.benchmark == "parallel":
+        bench_parallel(args.clients, args.workers, args.chunk_mb)
+    elif args.benchmark == "pricing":
+        bench_pricing(args.holdings, args.symbols, args.latency)
+    elif args.benchmark == "async-pricing":
+        bench_async_pricing(args.holdings, args.latency, args.concurrency, args.deadline, args.requests,
+                            args.tail_latency, args.tail_probability)
+    elif args.benchmark == "encode":
+        bench_encode(args.holdings, args.seconds)
+    elif args.benchmark == "response-cache":
+        bench_response_cache(args.clients, args.holdings, args.polls, args.tick_every)
+    elif args.benchmark == "stream":
+        bench_stream(args.holdings, args.latency, args.chunk_size)
@@ -1,25 +1,295 @@
 import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 import psycopg2
-from psycopg2.extras import execute_batch
+import psycopg2.pool
+from psycopg2.extras import execute_batch, execute_values
 from datetime import date
-from dataclasses import asdict
-from typing import List, Optional
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Iterable, List, Optional
 from json_decoder_FP import Client, JsonDecoder, TransformHolding
 
 
+def _copy_value(value) -> str:
+    """Renders a single value in PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float):
+        return repr(value)
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+
+class _CopyStream:
+    """
+    A read-only file-like object that renders rows in COPY text format on demand,
+    so psycopg2's copy_expert streams them without building the whole payload in memory.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._lines = ("\t".join(map(_copy_value, row)) + "\n" for row in rows)
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+
+@dataclass
+class LoadStats:
+    """Counters reported by DatabaseHandler.store_clients."""
+    clients: int = 0
+    rows: int = 0
+    commits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class PoolStats:
+    """Counters exposed by ConnectionPool.stats() for sizing the pool."""
+    checkouts: int = 0
+    waits: int = 0             # Checkouts that had to wait for a connection to be returned
+    wait_time: float = 0.0     # Total seconds spent waiting, across all checkouts
+    created: int = 0
+    closed: int = 0            # Connections evicted for idleness, failed health checks or discarded
+    failed_health_checks: int = 0
+    size: int = 0              # Connections currently open (idle + checked out)
+    idle: int = 0
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of warm PostgreSQL connections shared by many ETL worker threads.
+
+    Connections are handed out most-recently-used first, so under light load the extra
+    connections go cold and are evicted once idle for max_idle seconds (never below
+    min_size). A connection idle for longer than health_check_after seconds is checked
+    with SELECT 1 before being handed out, and replaced if it is dead.
+    """
+
+    def __init__(self, connection_string: str, min_size: int = 1, max_size: int = 10,
+                 max_idle: float = 300.0, health_check_after: float = 30.0, timeout: float = 30.0,
+                 connect: Optional[Callable] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            connection_string: The connection string for the PostgreSQL database.
+            min_size: Connections opened up front and kept open even when idle.
+            max_size: Upper bound on open connections; further checkouts wait.
+            max_idle: Seconds after which an idle connection above min_size is closed.
+            health_check_after: Idle seconds after which a connection is checked before reuse.
+            timeout: Default seconds getconn waits for a free connection.
+            connect: Factory for new DB-API connections (defaults to psycopg2.connect).
+            clock: Time source for idle ages (waiting for a connection always uses real time).
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("ConnectionPool requires 0 <= min_size <= max_size and max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self._connect = connect or (lambda: psycopg2.connect(connection_string))
+        self._clock = clock
+        self._idle = deque()  # (connection, last_used); most recently used on the right
+        self._size = 0
+        self._stats = PoolStats()
+        self._cond = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append((self._new_connection(), self._clock()))
+            self._size += 1
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._cond:
+            self._stats.created += 1
+        return conn
+
+    def _discard(self, conn):
+        """Closes a connection that is leaving the pool. Caller must hold no lock."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats.closed += 1
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        if getattr(conn, "closed", False):
+            return False
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self) -> list:
+        """Pops connections idle longer than max_idle, oldest first. Caller must hold the lock."""
+        evicted = []
+        now = self._clock()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            evicted.append(self._idle.popleft()[0])
+            self._size -= 1
+        return evicted
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Checks out a connection, waiting up to timeout seconds if max_size are in use.
+        Raises psycopg2.pool.PoolError on timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        conn = None
+        wait_started = None
+        evicted = []
+        with self._cond:
+            while True:
+                evicted.extend(self._evict_idle())
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1  # Reserve the slot; the connection is opened outside the lock
+                    last_used = None
+                    break
+                if wait_started is None:
+                    wait_started = time.monotonic()
+                    self._stats.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats.wait_time += time.monotonic() - wait_started
+                    raise psycopg2.pool.PoolError(f"Timed out after {timeout}s waiting for a pooled connection")
+                self._cond.wait(remaining)
+            if wait_started is not None:
+                self._stats.wait_time += time.monotonic() - wait_started
+
+        for stale in evicted:
+            self._discard(stale)
+
+        if conn is not None and self._clock() - last_used > self.health_check_after:
+            if not self._is_healthy(conn):
+                with self._cond:
+                    self._stats.failed_health_checks += 1
+                self._discard(conn)
+                conn = None
+        if conn is None:
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1  # Release the reserved slot
+                    self._cond.notify()
+                raise
+        with self._cond:
+            self._stats.checkouts += 1  # Only checkouts that handed out a connection
+        return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Returns a connection to the pool, or closes it if discard is set or it is broken."""
+        if not discard and not getattr(conn, "closed", False):
+            try:
+                conn.rollback()  # Never hand out a connection with an open transaction
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        with self._cond:
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.append((conn, self._clock()))
+            evicted = self._evict_idle()
+            self._cond.notify()
+        if discard:
+            self._discard(conn)
+        for stale in evicted:
+            self._discard(stale)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that checks out a connection and always returns it."""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except Exception:
+            self.putconn(conn, discard=getattr(conn, "closed", False))
+            raise
+        else:
+            self.putconn(conn)
+
+    def stats(self) -> PoolStats:
+        """Returns a snapshot of the pool counters."""
+        with self._cond:
+            return replace(self._stats, size=self._size, idle=len(self._idle))
+
+    def closeall(self):
+        """Closes every idle connection. Checked-out connections are closed when returned."""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self.min_size = 0
+        for conn in idle:
+            self._discard(conn)
+
+
 class DatabaseHandler:
     """
     Handles the storage of financial data (Client objects) into a PostgreSQL database.
     """
 
-    def __init__(self, connection_string: str):
+    CLIENT_COLUMNS = ("client_id", "partner_id", "data_date", "name")
+    ACCOUNT_COLUMNS = ("account_id", "client_id", "partner_id", "data_date", "value", "currency", "name", "type")
+    HOLDING_COLUMNS = ("holding_id", "account_id", "partner_id", "data_date", "name", "security",
+                       "quantity", "buy_price", "is_cash_like")
+    TRANSACTION_COLUMNS = ("transaction_id", "account_id", "holding_id", "partner_id", "data_date", "type",
+                           "quantity", "value", "date", "settle_date")
+
+    def __init__(self, connection_string: str, bulk: bool = False, pool: Optional[ConnectionPool] = None):
         """
         Initializes the DatabaseHandler with a PostgreSQL connection string.
 
         Args:
             connection_string: The connection string for the PostgreSQL database.
+            bulk: If True, store_clients streams each multi-client batch with COPY FROM STDIN into
+                staging tables and merges it with one set-based upsert per table instead of
+                multi-row INSERTs. store_client_data always uses batched INSERTs.
+            pool: Optional ConnectionPool to check connections out of instead of opening
+                a new one per call. A handler is not thread-safe; give each worker thread
+                its own DatabaseHandler sharing the same pool.
         """
         self.connection_string = connection_string
+        self.bulk = bulk
+        self.pool = pool
         self.conn = None  # Initialize connection to None
         self.cur = None
 
@@ -29,7 +299,7 @@ class DatabaseHandler:
         Handles connection errors gracefully.  Returns True if successful, False otherwise.
         """
         try:
-            self.conn = psycopg2.connect(self.connection_string)
+            self.conn = self.pool.getconn() if self.pool else psycopg2.connect(self.connection_string)
             self.cur = self.conn.cursor()
             return True
         except psycopg2.OperationalError as e:
@@ -41,30 +311,27 @@ class DatabaseHandler:
 
     def _close(self):
         """
-        Closes the database connection and cursor.
+        Closes the database connection and cursor, or returns the connection to the pool.
         """
         if self.cur:
             self.cur.close()
         if self.conn:
-            self.conn.close()
+            if self.pool:
+                self.pool.putconn(self.conn)
+            else:
+                self.conn.close()
         self.conn = None  # Reset connection and cursor after closing
         self.cur = None
 
-    def _insert_client(self, client: Client, partner_id: str, data_date: date):
-        """Inserts client data into the Clients table."""
-        insert_client = """
-            INSERT INTO financial_data.Clients (client_id, partner_id, data_date, name)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT DO NOTHING;
-        """
-        self.cur.execute(insert_client, (client.client_id, partner_id, data_date, client.name))
+    @staticmethod
+    def _client_rows(client: Client, partner_id: str, data_date: date) -> List[tuple]:
+        """Builds the Clients table row for a client."""
+        return [(client.client_id, partner_id, data_date, client.name)]
 
-    def _insert_accounts(self, client: Client, partner_id: str, data_date: date):
-        """Inserts account data into the Accounts table."""
-        if not client.accounts:
-            return
-
-        account_data = [
+    @staticmethod
+    def _account_rows(client: Client, partner_id: str, data_date: date) -> List[tuple]:
+        """Builds the Accounts table rows for a client."""
+        return [
             (
                 account.account_id,
                 client.client_id,
@@ -78,20 +345,10 @@ class DatabaseHandler:
             for account in client.accounts
         ]
 
-        insert_account = """
-            INSERT INTO financial_data.Accounts 
-            (account_id, client_id, partner_id, data_date, value, currency, name, type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING;
-        """
-        execute_batch(self.cur, insert_account, account_data)
-
-    def _insert_holdings(self, client: Client, partner_id: str, data_date: date):
-        """Inserts holding data into the Holdings table."""
-        if not client.holdings:
-            return
-
-        holding_data = [
+    @staticmethod
+    def _holding_rows(client: Client, partner_id: str, data_date: date) -> List[tuple]:
+        """Builds the Holdings table rows for a client."""
+        return [
             (
                 holding.holding_id,
                 holding.account_id,
@@ -106,20 +363,10 @@ class DatabaseHandler:
             for holding in client.holdings
         ]
 
-        insert_holding = """
-            INSERT INTO financial_data.Holdings 
-            (holding_id, account_id, partner_id, data_date, name, security, quantity, buy_price, is_cash_like)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING;
-        """
-        execute_batch(self.cur, insert_holding, holding_data)
-
-    def _insert_transactions(self, client: Client, partner_id: str, data_date: date):
-        """Inserts transaction data into the Transactions table."""
-        if not client.transactions:
-            return
-
-        transaction_data = [
+    @staticmethod
+    def _transaction_rows(client: Client, partner_id: str, data_date: date) -> List[tuple]:
+        """Builds the Transactions table rows for a client."""
+        return [
             (
                 transaction.transaction_id,
                 transaction.account_id,
@@ -135,6 +382,52 @@ class DatabaseHandler:
             for transaction in client.transactions
         ]
 
+    def _insert_client(self, client: Client, partner_id: str, data_date: date):
+        """Inserts client data into the Clients table."""
+        insert_client = """
+            INSERT INTO financial_data.Clients (client_id, partner_id, data_date, name)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT DO NOTHING;
+        """
+        self.cur.execute(insert_client, self._client_rows(client, partner_id, data_date)[0])
+
+    def _insert_accounts(self, client: Client, partner_id: str, data_date: date):
+        """Inserts account data into the Accounts table."""
+        if not client.accounts:
+            return
+
+        account_data = self._account_rows(client, partner_id, data_date)
+
+        insert_account = """
+            INSERT INTO financial_data.Accounts 
+            (account_id, client_id, partner_id, data_date, value, currency, name, type)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING;
+        """
+        execute_batch(self.cur, insert_account, account_data)
+
+    def _insert_holdings(self, client: Client, partner_id: str, data_date: date):
+        """Inserts holding data into the Holdings table."""
+        if not client.holdings:
+            return
+
+        holding_data = self._holding_rows(client, partner_id, data_date)
+
+        insert_holding = """
+            INSERT INTO financial_data.Holdings 
+            (holding_id, account_id, partner_id, data_date, name, security, quantity, buy_price, is_cash_like)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT DO NOTHING;
+        """
+        execute_batch(self.cur, insert_holding, holding_data)
+
+    def _insert_transactions(self, client: Client, partner_id: str, data_date: date):
+        """Inserts transaction data into the Transactions table."""
+        if not client.transactions:
+            return
+
+        transaction_data = self._transaction_rows(client, partner_id, data_date)
+
         insert_transaction = """
             INSERT INTO financial_data.Transactions 
             (transaction_id, account_id, holding_id, partner_id, data_date, type, quantity, value, date, settle_date)
@@ -143,6 +436,115 @@ class DatabaseHandler:
         """
         execute_batch(self.cur, insert_transaction, transaction_data)
 
+    def _copy_and_merge(self, table: str, columns: tuple, rows: Iterable[tuple]):
+        """
+        Streams rows into a staging table with COPY FROM STDIN, then merges them into
+        financial_data.<table> with a single set-based INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+        The staging table is a session-private temporary table: like an UNLOGGED table it
+        is never written to the WAL, and concurrent loaders cannot see each other's rows.
+        """
+        staging_table = f"staging_{table.lower()}"
+        column_list = ", ".join(columns)
+        self.cur.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {staging_table}
+            (LIKE financial_data.{table} INCLUDING DEFAULTS);
+        """)
+        self.cur.copy_expert(f"COPY {staging_table} ({column_list}) FROM STDIN", _CopyStream(rows))
+        self.cur.execute(f"""
+            INSERT INTO financial_data.{table} ({column_list})
+            SELECT {column_list} FROM {staging_table}
+            ON CONFLICT DO NOTHING;
+        """)
+        self.cur.execute(f"TRUNCATE {staging_table};")
+
+    def _insert_rows(self, table: str, columns: tuple, rows: List[tuple], page_size: int = 1000):
+        """Inserts rows into financial_data.<table> as multi-row INSERT ... ON CONFLICT DO NOTHING statements."""
+        insert_rows = f"""
+            INSERT INTO financial_data.{table} ({", ".join(columns)})
+            VALUES %s
+            ON CONFLICT DO NOTHING;
+        """
+        execute_values(self.cur, insert_rows, rows, page_size=page_size)
+
+    def _flush_batch(self, batch: dict):
+        """Writes a multi-client batch of rows table by table, parents first, then clears it."""
+        for table, columns in (("Clients", self.CLIENT_COLUMNS), ("Accounts", self.ACCOUNT_COLUMNS),
+                               ("Holdings", self.HOLDING_COLUMNS), ("Transactions", self.TRANSACTION_COLUMNS)):
+            rows = batch[table]
+            if not rows:
+                continue
+            if self.bulk:
+                self._copy_and_merge(table, columns, rows)
+            else:
+                self._insert_rows(table, columns, rows)
+            rows.clear()
+
+    def store_clients(self, clients: Iterable[Client], partner_id: str, data_date: date,
+                      batch_size: int = 10000, commit_every: int = 10) -> LoadStats:
+        """
+        Stores many clients over a single connection. Rows from consecutive clients are
+        grouped into multi-table batches, and a commit is issued every commit_every batches.
+
+        Args:
+            clients: An iterable (e.g. JsonDecoder.iter_clients) of Client objects to store.
+            partner_id: The ID of the partner associated with the clients.
+            data_date: The date for the data being stored.
+            batch_size: Number of rows (across all tables) to accumulate before writing a batch.
+            commit_every: Number of batches to write per transaction.
+
+        Returns:
+            LoadStats for the committed rows. On error the uncommitted batches are rolled back;
+            earlier commits are kept, and re-running the load is safe because inserts are idempotent.
+        """
+        stats = LoadStats()
+        if not self._connect():  # Attempt to connect, and exit if it fails.
+            return stats
+
+        batch = {"Clients": [], "Accounts": [], "Holdings": [], "Transactions": []}
+        batch_rows = 0
+        pending_rows = 0  # Written but not yet committed
+        pending_batches = 0
+        start = time.perf_counter()
+        try:
+            for client in clients:
+                batch["Clients"].extend(self._client_rows(client, partner_id, data_date))
+                batch["Accounts"].extend(self._account_rows(client, partner_id, data_date))
+                batch["Holdings"].extend(self._holding_rows(client, partner_id, data_date))
+                batch["Transactions"].extend(self._transaction_rows(client, partner_id, data_date))
+                batch_rows = sum(map(len, batch.values()))
+                stats.clients += 1
+
+                if batch_rows >= batch_size:
+                    self._flush_batch(batch)
+                    pending_rows += batch_rows
+                    batch_rows = 0
+                    pending_batches += 1
+                    if pending_batches >= commit_every:
+                        self.conn.commit()
+                        stats.commits += 1
+                        stats.rows += pending_rows
+                        pending_rows = pending_batches = 0
+
+            if batch_rows:
+                self._flush_batch(batch)
+                pending_rows += batch_rows
+            self.conn.commit()
+            stats.commits += 1
+            stats.rows += pending_rows
+            stats.seconds = time.perf_counter() - start
+            print(f"Stored {stats.clients} clients ({stats.rows} rows) in {stats.seconds:.2f}s: "
+                  f"{stats.rows_per_sec:.0f} rows/sec.")
+
+        except psycopg2.Error as e:
+            print(f"Error while storing data: {e}")
+            if self.conn:
+                self.conn.rollback()  # Rollback the uncommitted batches
+            stats.seconds = time.perf_counter() - start
+
+        finally:
+            self._close()  # Always close the connection
+        return stats
 
     def store_client_data(self, client: Client, partner_id: str, data_date: date):
         """
@@ -157,6 +559,7 @@ class DatabaseHandler:
             return
 
         try:
+            # A single client is too small for COPY and staging tables to pay off, so bulk is not used here
             self._insert_client(client, partner_id, data_date)
             self._insert_accounts(client, partner_id, data_date)
             self._insert_holdings(client, partner_id, data_date)
@@ -0,0 +1,137 @@
+import math
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from json_decoder_FP import Holding, HoldingsTable
+
+# One holding with its currentPrice, in Holding field order (the same keys asdict() + "currentPrice" gave).
+_HOLDING_TEMPLATE = ('{"holding_id": %s, "account_id": %s, "name": %s, "security": %s, "quantity": %s, '
+                     '"buy_price": %s, "is_cash_like": %s, "currentPrice": %s}')
+
+
+def json_scalar(value: Any) -> str:
+    """Encodes a str, number, bool or None exactly as json.dumps would (ensure_ascii)."""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "Infinity" if value > 0 else "-Infinity"
+        return float.__repr__(value)
+    if isinstance(value, int):
+        return int.__repr__(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not a JSON scalar")
+
+
+def holdings_to_json(holdings: Iterable[Holding], prices: Dict[str, Optional[float]]) -> bytes:
+    """
+    Serializes holdings with their currentPrice straight to JSON bytes, without building a dict per
+    holding (asdict deep-copies each one) or walking it again in the JSON encoder. The output is the
+    same JSON as json.dumps([asdict(h) | {"currentPrice": ...}]).
+
+    A HoldingsTable is encoded column-wise: each pooled string (account ids, names, securities) and
+    each security's price is encoded once, not once per row.
+    """
+    if isinstance(holdings, HoldingsTable):
+        return _table_to_json(holdings, prices)
+
+    holdings = list(holdings)
+    encoded = {}  # Repeated strings (account ids, names, securities) are encoded once per response
+    for value in {value for h in holdings for value in (h.account_id, h.name, h.security)}:
+        encoded[value] = json_scalar(value)
+    encoded_prices = {security: json_scalar(price) for security, price in prices.items()}
+    encoded_prices[None] = "null"
+    flags = {True: "true", False: "false", None: "null"}
+    rows = zip(
+        map(json_scalar, [h.holding_id for h in holdings]),
+        [encoded[h.account_id] for h in holdings],
+        [encoded[h.name] for h in holdings],
+        [encoded[h.security] for h in holdings],
+        _encode_floats([h.quantity for h in holdings]),
+        _encode_floats([h.buy_price for h in holdings]),
+        [flags[h.is_cash_like] for h in holdings],
+        [encoded_prices.get(h.security, "null") for h in holdings],
+    )
+    return _join_rows(rows)
+
+
+def iter_holdings_json(pages: Iterable[List[Holding]],
+                       get_prices: Callable[[Iterable[Optional[str]]], Dict[str, Optional[float]]]) -> Iterator[bytes]:
+    """
+    Streams one JSON array over pages of holdings, pricing each page as it is reached, so only one
+    page is held at a time. The chunks join to the same bytes holdings_to_json gives for all the rows.
+    """
+    yield b"["
+    separator = b""
+    for page in pages:
+        if not page:
+            continue
+        body = holdings_to_json(page, get_prices(_securities(page)))
+        yield separator + body[1:-1]  # The page's rows without its own brackets
+        separator = b", "
+    yield b"]"
+
+
+def stream_holdings_json(holdings: Iterable[Holding],
+                         get_prices: Callable[[Iterable[Optional[str]]], Dict[str, Optional[float]]],
+                         chunk_size: int = 1000) -> Iterator[bytes]:
+    """
+    Streams a client's holdings (a list or a HoldingsTable) as one JSON array, chunk_size rows at a
+    time, each chunk priced and encoded only when the consumer reaches it. The first byte goes out
+    before any price is fetched, and at most one chunk's JSON is held at once.
+    """
+    if isinstance(holdings, HoldingsTable):
+        chunks = (holdings.slice_rows(start, start + chunk_size) for start in range(0, len(holdings), chunk_size))
+    else:
+        holdings = holdings if isinstance(holdings, list) else list(holdings)
+        chunks = (holdings[start:start + chunk_size] for start in range(0, len(holdings), chunk_size))
+    return iter_holdings_json(chunks, get_prices)
+
+
+def _securities(holdings) -> Iterable[Optional[str]]:
+    if isinstance(holdings, HoldingsTable):
+        return map(holdings.pool.get, set(holdings.security))  # Without materializing a Holding per row
+    return (holding.security for holding in holdings)
+
+
+def _table_to_json(table: HoldingsTable, prices: Dict[str, Optional[float]]) -> bytes:
+    strings = table.pool.strings
+    if len(strings) <= 3 * len(table):  # Each row adds at most 3 strings, so this is not a slice of a larger table
+        pool = [json_scalar(string) for string in strings] + ["null"]  # Code -1 (None) is the last entry
+        price_by_code = [json_scalar(prices.get(string)) for string in strings] + ["null"]
+    else:
+        # A slice sharing a large client's pool (see stream_holdings_json): encode only the codes it uses
+        codes = set(table.account_id).union(table.name, table.security)
+        pool = {code: json_scalar(strings[code]) if code >= 0 else "null" for code in codes}
+        price_by_code = {code: json_scalar(prices.get(strings[code])) if code >= 0 else "null"
+                         for code in set(table.security)}
+    flags = {1: "true", 0: "false", -1: "null"}
+    rows = zip(
+        map(json_scalar, table.holding_id),
+        map(pool.__getitem__, table.account_id),
+        map(pool.__getitem__, table.name),
+        map(pool.__getitem__, table.security),
+        _encode_floats(table.quantity),
+        _encode_floats(table.buy_price),
+        map(flags.__getitem__, table.is_cash_like),
+        map(price_by_code.__getitem__, table.security),
+    )
+    return _join_rows(rows)
+
+
+def _encode_floats(column) -> Iterable[str]:
+    """Encodes a column of numbers; repr is exactly json's encoding for finite floats and ints."""
+    if all(map(math.isfinite, column)):
+        return map(repr, column)
+    return map(json_scalar, column)
+
+
+def _join_rows(rows: Iterable[tuple]) -> bytes:
+    template = _HOLDING_TEMPLATE
+    return ("[" + ", ".join([template % row for row in rows]) + "]").encode("ascii")
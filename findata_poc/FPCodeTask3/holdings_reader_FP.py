@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import date
+from typing import Iterator, List, Optional, Tuple
+from db_insert_client_FP import ConnectionPool
+from json_decoder_FP import Holding
+
+
+class HoldingsReader:
+    """
+    Reads one client's holdings for a partner and data_date from financial_data.Holdings (joined to
+    Accounts for the client_id), a page at a time with keyset pagination on (account_id, holding_id).
+
+    Each page checks a connection out of the pool and returns it before the page is used, so a slow
+    consumer of a large client never pins a connection. A data_date's rows are written once by the
+    ETL and not updated afterwards, so the pages of a walk are consistent without one long transaction.
+    """
+
+    SELECT_PAGE = """
+        SELECT h.holding_id, h.account_id, h.name, h.security, h.quantity, h.buy_price, h.is_cash_like
+        FROM financial_data.Holdings h
+        JOIN financial_data.Accounts a
+          ON a.account_id = h.account_id AND a.partner_id = h.partner_id AND a.data_date = h.data_date
+        WHERE a.client_id = %s AND h.partner_id = %s AND h.data_date = %s {after}
+        ORDER BY h.account_id, h.holding_id
+        LIMIT %s;
+    """
+    AFTER = "AND (h.account_id, h.holding_id) > (%s, %s)"
+
+    def __init__(self, pool: ConnectionPool, page_size: int = 1000):
+        """
+        Args:
+            pool: ConnectionPool for read connections (may be shared with other readers).
+            page_size: Default rows per page, i.e. per query.
+        """
+        self.pool = pool
+        self.page_size = page_size
+
+    @staticmethod
+    def encode_cursor(account_id: str, holding_id: str) -> str:
+        """Opaque, URL-safe cursor for the position after (account_id, holding_id)."""
+        return base64.urlsafe_b64encode(json.dumps([account_id, holding_id]).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Raises ValueError for a cursor this reader did not produce."""
+        try:
+            account_id, holding_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        return str(account_id), str(holding_id)
+
+    @staticmethod
+    def _holding(row: tuple) -> Holding:
+        holding_id, account_id, name, security, quantity, buy_price, is_cash_like = row
+        return Holding(
+            holding_id=holding_id,
+            account_id=account_id,
+            name=name,
+            security=security,
+            quantity=float(quantity) if quantity is not None else None,  # DECIMAL columns arrive as Decimal
+            buy_price=float(buy_price) if buy_price is not None else None,
+            is_cash_like=is_cash_like,
+        )
+
+    def fetch_page(self, client_id: str, partner_id: str, data_date: date, after: Optional[str] = None,
+                   limit: Optional[int] = None) -> Tuple[List[Holding], Optional[str]]:
+        """
+        Returns (holdings, next_cursor): up to limit holdings after the cursor, and the cursor for the
+        next page, or None when this was the last one.
+        """
+        limit = limit or self.page_size
+        params = [client_id, partner_id, data_date]
+        if after is not None:
+            params.extend(self.decode_cursor(after))
+        params.append(limit + 1)  # One extra row tells whether there is a next page
+        query = self.SELECT_PAGE.format(after=self.AFTER if after is not None else "")
+
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+
+        holdings = [self._holding(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = self.encode_cursor(holdings[-1].account_id, holdings[-1].holding_id)
+        return holdings, next_cursor
+
+    def iter_pages(self, client_id: str, partner_id: str, data_date: date, after: Optional[str] = None,
+                   page_size: Optional[int] = None) -> Iterator[List[Holding]]:
+        """Yields every page of the client's holdings after the cursor; only one page is held at a time."""
+        while True:
+            holdings, after = self.fetch_page(client_id, partner_id, data_date, after, page_size)
+            if holdings:
+                yield holdings
+            if after is None:
+                return
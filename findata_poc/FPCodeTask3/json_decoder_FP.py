@@ -1,8 +1,32 @@
 import json
-from dataclasses import dataclass, replace
-from typing import List, Optional
+import codecs
+import os
+import re
+from array import array
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from itertools import compress
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
 import datetime
 
+try:
+    import numpy  # Optional: vectorizes HoldingRuleEngine masks over the table columns
+except ImportError:
+    numpy = None
+
+try:
+    import orjson  # Optional: faster JSON parser backend
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec  # Optional: schema-typed decoder backend
+except ImportError:
+    msgspec = None
+
 @dataclass(frozen=True)
 class Account:
     account_id: str
@@ -46,6 +70,17 @@ class Holding:
             is_cash_like=isCashLike
         )
 
+@lru_cache(maxsize=4096)
+def parse_date(date_str: str) -> datetime.date:
+    """
+    Parses a "%Y-%m-%d" date. Transaction dates repeat heavily, so recently seen strings are memoised;
+    date.fromisoformat is the fast path, and anything not shaped like YYYY-MM-DD goes through strptime
+    so the accepted format stays exactly "%Y-%m-%d".
+    """
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-" and date_str.isascii():
+        return datetime.date.fromisoformat(date_str)
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
 @dataclass(frozen=True)
 class Transaction:
     transaction_id: str
@@ -61,8 +96,8 @@ class Transaction:
     def from_dict(cls, data: dict) -> "Transaction":
         date_str = data.get("date")
         settle_date_str = data.get("settleDate")
-        date_parsed = datetime.datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None
-        settle_date_parsed = datetime.datetime.strptime(settle_date_str, "%Y-%m-%d").date() if settle_date_str else None
+        date_parsed = parse_date(date_str) if date_str else None
+        settle_date_parsed = parse_date(settle_date_str) if settle_date_str else None
 
         return cls(
             transaction_id=data.get("id"),
@@ -75,19 +110,212 @@ class Transaction:
             settle_date=settle_date_parsed
         )
 
+class StringPool:
+    """Interns repeated strings (account ids, names, securities, types) as small integer codes. None is -1."""
+    __slots__ = ("strings", "codes")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def get(self, code: int) -> Optional[str]:
+        return None if code < 0 else self.strings[code]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __reduce__(self):
+        return (_rebuild_string_pool, (self.strings,))  # The code index is rebuilt rather than pickled
+
+def _rebuild_string_pool(strings: List[str]) -> StringPool:
+    pool = StringPool()
+    pool.strings = strings
+    pool.codes = dict(zip(strings, range(len(strings))))
+    return pool
+
+class _ColumnarTable(Sequence):
+    """
+    Base for the columnar row containers: one array (or list, for unique ids) per field
+    instead of one object per row. Indexing and iteration materialize row objects on the fly.
+    """
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self.row(index)
+
+    def __iter__(self):
+        return map(self.row, range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_ColumnarTable, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} rows)"
+
+class HoldingsTable(_ColumnarTable):
+    """Column-oriented storage for a client's holdings. Iterates as Holding instances."""
+    __slots__ = ("pool", "holding_id", "account_id", "name", "security", "quantity", "buy_price", "is_cash_like")
+    POOLED_COLUMNS = ("account_id", "name", "security")
+    FLOAT_COLUMNS = ("quantity", "buy_price")
+    FLAG_COLUMNS = ("is_cash_like",)
+
+    def __init__(self, pool: Optional[StringPool] = None):
+        self.pool = pool if pool is not None else StringPool()
+        self.holding_id: List[str] = []       # Unique per row, so not pooled
+        self.account_id = array("i")          # Codes into pool
+        self.name = array("i")
+        self.security = array("i")
+        self.quantity = array("d")
+        self.buy_price = array("d")
+        self.is_cash_like = array("b")        # 1, 0, or -1 for None
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[dict], pool: Optional[StringPool] = None) -> "HoldingsTable":
+        table = cls(pool)
+        for item in items:
+            table.append(Holding.from_dict(item))
+        return table
+
+    def append(self, holding: Holding) -> None:
+        add = self.pool.add
+        self.holding_id.append(holding.holding_id)
+        self.account_id.append(add(holding.account_id))
+        self.name.append(add(holding.name))
+        self.security.append(add(holding.security))
+        self.quantity.append(holding.quantity)
+        self.buy_price.append(holding.buy_price)
+        self.is_cash_like.append(-1 if holding.is_cash_like is None else int(holding.is_cash_like))
+
+    def encode(self, column: str, value: Any, add: bool = False) -> Optional[Any]:
+        """
+        Converts a field value to its stored column value (a pool code, float, or flag). For a pooled
+        string not yet in the pool this returns None (no row can match) unless add=True.
+        """
+        if column in self.POOLED_COLUMNS:
+            if value is None:
+                return -1
+            return self.pool.add(value) if add else self.pool.codes.get(value)
+        if column in self.FLOAT_COLUMNS:
+            return float(value)
+        if column in self.FLAG_COLUMNS:
+            return -1 if value is None else int(bool(value))
+        raise ValueError(f"HoldingsTable column {column!r} cannot be used in a column rule")
+
+    def with_columns(self, **columns) -> "HoldingsTable":
+        """Returns a new table with the given columns replaced, sharing every other column (and the pool) without copying."""
+        table = HoldingsTable.__new__(HoldingsTable)
+        for name in self.__slots__:
+            setattr(table, name, columns.get(name, getattr(self, name)))
+        return table
+
+    def slice_rows(self, start: int, stop: int) -> "HoldingsTable":
+        """Rows [start, stop) as a table sharing the string pool; only that range of each column is copied."""
+        return self.with_columns(**{name: getattr(self, name)[start:stop] for name in self.__slots__ if name != "pool"})
+
+    def row(self, index: int) -> Holding:
+        get = self.pool.get
+        is_cash_like = self.is_cash_like[index]
+        return Holding(
+            holding_id=self.holding_id[index],
+            account_id=get(self.account_id[index]),
+            name=get(self.name[index]),
+            security=get(self.security[index]),
+            quantity=self.quantity[index],
+            buy_price=self.buy_price[index],
+            is_cash_like=None if is_cash_like < 0 else bool(is_cash_like)
+        )
+
+class TransactionsTable(_ColumnarTable):
+    """Column-oriented storage for a client's transactions. Dates are kept as ordinals (0 for None)."""
+    __slots__ = ("pool", "transaction_id", "account_id", "holding_id", "type", "quantity", "value",
+                 "date", "settle_date")
+
+    def __init__(self, pool: Optional[StringPool] = None):
+        self.pool = pool if pool is not None else StringPool()
+        self.transaction_id: List[str] = []   # Unique per row, so not pooled
+        self.account_id = array("i")          # Codes into pool
+        self.holding_id = array("i")
+        self.type = array("i")
+        self.quantity = array("d")
+        self.value = array("d")
+        self.date = array("i")
+        self.settle_date = array("i")
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[dict], pool: Optional[StringPool] = None) -> "TransactionsTable":
+        table = cls(pool)
+        for item in items:
+            table.append(Transaction.from_dict(item))
+        return table
+
+    def append(self, transaction: Transaction) -> None:
+        add = self.pool.add
+        self.transaction_id.append(transaction.transaction_id)
+        self.account_id.append(add(transaction.account_id))
+        self.holding_id.append(add(transaction.holding_id))
+        self.type.append(add(transaction.type))
+        self.quantity.append(transaction.quantity)
+        self.value.append(transaction.value)
+        self.date.append(transaction.date.toordinal() if transaction.date else 0)
+        self.settle_date.append(transaction.settle_date.toordinal() if transaction.settle_date else 0)
+
+    def row(self, index: int) -> Transaction:
+        get = self.pool.get
+        date = self.date[index]
+        settle_date = self.settle_date[index]
+        return Transaction(
+            transaction_id=self.transaction_id[index],
+            account_id=get(self.account_id[index]),
+            holding_id=get(self.holding_id[index]),
+            type=get(self.type[index]),
+            quantity=self.quantity[index],
+            value=self.value[index],
+            date=datetime.date.fromordinal(date) if date else None,
+            settle_date=datetime.date.fromordinal(settle_date) if settle_date else None
+        )
+
 @dataclass(frozen=True)
 class Client:
     client_id: str
     name: str
     accounts: List[Account]
-    holdings: List[Holding]
-    transactions: List[Transaction]
+    holdings: Sequence[Holding]       # A list, or a HoldingsTable when decoded with columnar=True
+    transactions: Sequence[Transaction]
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Client":
+    def from_dict(cls, data: dict, columnar: bool = False) -> "Client":
+        """
+        Builds a Client from partner JSON. With columnar=True, holdings and transactions are stored
+        as a HoldingsTable/TransactionsTable sharing one StringPool, which is far smaller for large clients.
+        """
         accounts = [Account.from_dict(a) for a in data.get("accounts", [])]
-        holdings = [Holding.from_dict(h) for h in data.get("holdings", [])]
-        transactions = [Transaction.from_dict(t) for t in data.get("transactions", [])]
+        if columnar:
+            pool = StringPool()
+            holdings = HoldingsTable.from_dicts(data.get("holdings", []), pool)
+            transactions = TransactionsTable.from_dicts(data.get("transactions", []), pool)
+        else:
+            holdings = [Holding.from_dict(h) for h in data.get("holdings", [])]
+            transactions = [Transaction.from_dict(t) for t in data.get("transactions", [])]
         return cls(
             client_id=data.get("id"),
             name=data.get("name"),
@@ -96,34 +324,647 @@ class Client:
             transactions=transactions
         )
 
+    def __reduce__(self):
+        """
+        Pickles as plain value tuples per row (tables pickle their arrays as-is) instead of one
+        class-tagged state dict per Account/Holding/Transaction, keeping process-pool IPC small.
+        """
+        return (_rebuild_client, (self.client_id, self.name, _pack_rows(self.accounts),
+                                  _pack_rows(self.holdings), _pack_rows(self.transactions)))
+
+def _pack_rows(rows):
+    if isinstance(rows, _ColumnarTable):
+        return rows
+    return [tuple(row.__dict__.values()) for row in rows]
+
+def _unpack_rows(cls, rows):
+    if isinstance(rows, _ColumnarTable):
+        return rows
+    fields = tuple(cls.__dataclass_fields__)
+    new = object.__new__
+    unpacked = []
+    for values in rows:
+        row = new(cls)
+        row.__dict__.update(zip(fields, values))  # Skips the frozen __init__; the values were already validated
+        unpacked.append(row)
+    return unpacked
+
+def _rebuild_client(client_id, name, accounts, holdings, transactions) -> Client:
+    return Client(client_id, name, _unpack_rows(Account, accounts), _unpack_rows(Holding, holdings),
+                  _unpack_rows(Transaction, transactions))
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """
+    A holding normalization rule: holdings whose fields equal every value in `when` get the values
+    in `assign`. A rule with a partner_id only applies to that partner's holdings.
+    """
+    name: str
+    when: Dict[str, Any]
+    assign: Dict[str, Any] = field(default_factory=dict)
+    partner_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnRule":
+        return cls(
+            name=data.get("name"),
+            when=dict(data.get("when", {})),
+            assign=dict(data.get("assign", {})),
+            partner_id=data.get("partner_id")
+        )
+
+    def matches(self, holding: Holding) -> bool:
+        return all(getattr(holding, column) == value for column, value in self.when.items())
+
+DEPOSITORY_SWEEP_RULE = ColumnRule(
+    name="Depository Sweep is CASH",
+    when={"name": "Depository Sweep", "security": None, "buy_price": 1, "is_cash_like": True},
+    assign={"name": "CASH"}
+)
+
+_ANY = object()  # Dispatch key for a rule that does not constrain name (or security)
+
+class HoldingRuleEngine:
+    """
+    Compiles ColumnRules into one dispatch table keyed on (name, security). A holding is looked up
+    in at most four buckets ((name, security), (name, any), (any, security), (any, any)) and only
+    the rules found there have their residual conditions checked, so the per-holding cost does not
+    grow with the number of rules. The first matching rule (in rule order) wins.
+
+    For a HoldingsTable, one pass over the pooled name/security columns (vectorized with NumPy when
+    installed) finds the rows any rule could match; only those are dispatched. Matched rows are
+    written into a copy of only the assigned columns, and the returned table shares every untouched
+    column with the input.
+    """
+    KEY_COLUMNS = ("name", "security")
+
+    def __init__(self, rules: Iterable[ColumnRule]):
+        self.rules = list(rules)
+        self.dispatch: Dict[tuple, List[tuple]] = defaultdict(list)  # (name, security) -> [(priority, rule, residual)]
+        for priority, rule in enumerate(self.rules):
+            for column in list(rule.when) + list(rule.assign):
+                if column not in Holding.__dataclass_fields__ or column == "holding_id":
+                    raise ValueError(f"Rule {rule.name!r} uses unknown or unsupported holding field {column!r}")
+            key = tuple(rule.when.get(column, _ANY) for column in self.KEY_COLUMNS)
+            residual = tuple((column, value) for column, value in rule.when.items() if column not in self.KEY_COLUMNS)
+            self.dispatch[key].append((priority, rule, residual))
+        self.candidates = lru_cache(maxsize=65536)(self._lookup)
+
+    def _lookup(self, name: Optional[str], security: Optional[str]) -> tuple:
+        """The rules that could match a holding with this name and security, in priority order."""
+        found = []
+        for key in ((name, security), (name, _ANY), (_ANY, security), (_ANY, _ANY)):
+            found.extend(self.dispatch.get(key, ()))
+        return tuple(sorted(found, key=lambda candidate: candidate[0]))
+
+    def match(self, holding: Holding) -> Optional[ColumnRule]:
+        for _, rule, residual in self.candidates(holding.name, holding.security):
+            if all(getattr(holding, column) == value for column, value in residual):
+                return rule
+        return None
+
+    def apply_row(self, holding: Holding) -> Holding:
+        rule = self.match(holding)
+        return replace(holding, **rule.assign) if rule is not None else holding
+
+    def apply(self, table: HoldingsTable) -> HoldingsTable:
+        rows_by_rule = defaultdict(list)
+        encoded = {}  # Per rule: residual conditions as (column, stored target), or None if it cannot match
+        pool_get = table.pool.get
+        for row in self._candidate_rows(table):
+            for priority, rule, residual in self.candidates(pool_get(table.name[row]), pool_get(table.security[row])):
+                if priority not in encoded:
+                    targets = [(getattr(table, column), table.encode(column, value)) for column, value in residual]
+                    encoded[priority] = None if any(target is None for _, target in targets) else targets
+                if encoded[priority] is not None and all(column[row] == target for column, target in encoded[priority]):
+                    rows_by_rule[priority].append(row)
+                    break
+
+        replaced = {}  # Columns copied on first write
+        for priority, rows in rows_by_rule.items():
+            for name, value in self.rules[priority].assign.items():
+                if name not in replaced:
+                    replaced[name] = array(getattr(table, name).typecode, getattr(table, name))
+                self._assign(replaced[name], rows, table.encode(name, value, add=True))
+        return table.with_columns(**replaced) if replaced else table
+
+    def _candidate_rows(self, table: HoldingsTable) -> Iterable[int]:
+        """Rows whose name or security some rule is keyed on (every row if a rule is keyed on neither)."""
+        if (_ANY, _ANY) in self.dispatch:
+            return range(len(table))
+        codes = {column: set() for column in self.KEY_COLUMNS}
+        for key in self.dispatch:
+            column, value = ("name", key[0]) if key[0] is not _ANY else ("security", key[1])
+            code = table.encode(column, value)
+            if code is not None:  # A string in no row of this table matches nothing
+                codes[column].add(code)
+
+        if numpy is not None:
+            mask = numpy.zeros(len(table), dtype=bool)
+            for column, column_codes in codes.items():
+                if column_codes:
+                    mask |= numpy.isin(numpy.frombuffer(getattr(table, column), dtype="i"), list(column_codes))
+            return numpy.flatnonzero(mask).tolist()
+
+        rows = set()
+        for column, column_codes in codes.items():
+            if column_codes:
+                rows.update(compress(range(len(table)), map(column_codes.__contains__, getattr(table, column))))
+        return sorted(rows)
+
+    @staticmethod
+    def _assign(column, rows, value):
+        if numpy is not None:
+            numpy.frombuffer(column, dtype=column.typecode)[rows] = value
+            return
+        for row in rows:
+            column[row] = value
+
+class HoldingRuleRegistry:
+    """
+    Holds the global and partner-specific holding rules, loadable from JSON config, and hands out
+    one compiled HoldingRuleEngine per partner (global rules plus that partner's, in load order).
+
+    Config format: {"rules": [{"name": ..., "partner_id": optional, "when": {field: value}, "assign": {field: value}}]}
+    """
+    def __init__(self, rules: Iterable[ColumnRule] = ()):
+        self.rules: List[ColumnRule] = []
+        self.engines: Dict[Optional[str], HoldingRuleEngine] = {}
+        self.register(*rules)
+
+    def register(self, *rules: ColumnRule) -> None:
+        self.rules.extend(rules)
+        self.engines.clear()  # Recompiled on next use
+
+    def load(self, config) -> None:
+        """Registers the rules from a config dict or a path to a JSON config file."""
+        if isinstance(config, str):
+            with open(config) as f:
+                config = json.load(f)
+        self.register(*(ColumnRule.from_dict(rule) for rule in config.get("rules", [])))
+
+    def engine(self, partner_id: Optional[str] = None) -> HoldingRuleEngine:
+        if partner_id not in self.engines:
+            self.engines[partner_id] = HoldingRuleEngine(
+                rule for rule in self.rules if rule.partner_id is None or rule.partner_id == partner_id
+            )
+        return self.engines[partner_id]
+
+holding_rules = HoldingRuleRegistry([DEPOSITORY_SWEEP_RULE])
+
 class TransformHolding:
     """Encapsulates the functional transformation of holdings in a Client."""
-    
+
     @staticmethod
-    def update_holding(holding: Holding) -> Holding:
-        """If the holding qualifies as a Depository Sweep, update its name to 'CASH'."""
-        if (holding.name == "Depository Sweep" and
-            holding.security is None and
-            holding.buy_price == 1 and
-            holding.is_cash_like):
-            return replace(holding, name="CASH")
-        return holding
+    def update_holding(holding: Holding, partner_id: Optional[str] = None) -> Holding:
+        """Apply the first matching normalization rule, e.g. rename a Depository Sweep to 'CASH'."""
+        return holding_rules.engine(partner_id).apply_row(holding)
 
     @staticmethod
-    def update_holdings(holdings: List[Holding]) -> List[Holding]:
-        """Apply the update to all holdings."""
-        return list(map(TransformHolding.update_holding, holdings))
+    def update_holdings(holdings: Sequence[Holding], partner_id: Optional[str] = None) -> Sequence[Holding]:
+        """Apply the update to all holdings, column-wise for a HoldingsTable."""
+        engine = holding_rules.engine(partner_id)
+        if isinstance(holdings, HoldingsTable):
+            return engine.apply(holdings)
+        return list(map(engine.apply_row, holdings))
     
-    def __new__(cls, client: Client) -> Client:
+    def __new__(cls, client: Client, partner_id: Optional[str] = None) -> Client:
         """Transforms the client's holdings and returns a new Client instance."""
-        updated_holdings = TransformHolding.update_holdings(client.holdings)
+        updated_holdings = TransformHolding.update_holdings(client.holdings, partner_id)
         return replace(client, holdings=updated_holdings)
 
+def iter_json_array(fileobj: IO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Incrementally parses a top-level JSON array from a file object, yielding one element at a time.
+
+    Only the current element (plus at most one read chunk) is held in memory, so the
+    cost stays flat regardless of how many elements the array contains. Works with
+    both text and binary (UTF-8) file objects, e.g. open(path, 'rb') or ZipFile.open().
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = ""
+        while not chunk:  # A read can end mid multi-byte character and decode to nothing
+            if eof:
+                return False
+            raw = fileobj.read(chunk_size)
+            eof = not raw
+            chunk = text_decoder.decode(raw, final=eof) if isinstance(raw, bytes) else raw
+        buffer = buffer[pos:] + chunk  # Drop what has already been consumed
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        """Advances pos to the next non-whitespace character, reading as needed. False at EOF."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return True
+            if not read_more():
+                return False
+
+    if skip_whitespace() and buffer[pos] == "\ufeff":  # Tolerate a UTF-8 byte order mark
+        pos += 1
+    if not skip_whitespace() or buffer[pos] != "[":
+        raise ValueError("Expected a top-level JSON array")
+    pos += 1
+
+    expect_element = True
+    while True:
+        if not skip_whitespace():
+            raise ValueError("Unexpected end of input inside top-level JSON array")
+        char = buffer[pos]
+        if char == "]":
+            return
+        if char == ",":
+            if expect_element:
+                raise ValueError("Unexpected ',' in top-level JSON array")
+            pos += 1
+            expect_element = True
+            continue
+        if not expect_element:
+            raise ValueError(f"Expected ',' or ']' in top-level JSON array, got {char!r}")
+
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element is split across chunks; at least double the buffered
+                # remainder before retrying so a large element is re-parsed only O(log n) times.
+                target = 2 * (len(buffer) - pos)
+                if not read_more():
+                    raise
+                while len(buffer) - pos < target and read_more():
+                    pass
+                continue
+            # A scalar ending exactly at the buffer edge may be truncated (e.g. a number).
+            if end == len(buffer) and read_more():
+                continue
+            break
+        pos = end
+        expect_element = False
+        yield element
+
+class StdlibBackend:
+    """Decoder backend: parse with the stdlib json module, then build dataclasses with from_dict."""
+    name = "stdlib"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def decode_client(self, data, columnar: bool = False) -> Client:
+        return Client.from_dict(self.loads(data), columnar)
+
+    def decode_clients(self, data, columnar: bool = False) -> List[Client]:
+        """Decodes a top-level JSON array of clients."""
+        return [Client.from_dict(item, columnar) for item in self.loads(data)]
+
+class OrjsonBackend(StdlibBackend):
+    """Decoder backend: parse with orjson (several times faster than json), then from_dict as usual."""
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+if msgspec is not None:
+    # Wire schema of the partner JSON. msgspec validates and converts straight from bytes into these
+    # (no intermediate dicts); lax mode accepts the partner's numeric strings ("12098") and "true"/"false".
+    class _AccountWire(msgspec.Struct, rename={"account_id": "id"}):
+        value: float
+        account_id: Optional[str] = None
+        currency: Optional[str] = None
+        name: Optional[str] = None
+        type: Optional[str] = None
+
+    class _HoldingWire(msgspec.Struct, rename={"holding_id": "id", "account_id": "accountId",
+                                               "buy_price": "buyPrice", "is_cash_like": "isCashLike"}):
+        quantity: float
+        buy_price: float
+        holding_id: Optional[str] = None
+        account_id: Optional[str] = None
+        name: Optional[str] = None
+        security: Optional[str] = None
+        is_cash_like: Optional[bool] = None
+
+    class _TransactionWire(msgspec.Struct, rename={"transaction_id": "id", "account_id": "accountId",
+                                                   "holding_id": "holdingId", "settle_date": "settleDate"}):
+        quantity: float
+        value: float
+        transaction_id: Optional[str] = None
+        account_id: Optional[str] = None
+        holding_id: Optional[str] = None
+        type: Optional[str] = None
+        date: Optional[datetime.date] = None
+        settle_date: Optional[datetime.date] = None
+
+    class _ClientWire(msgspec.Struct, rename={"client_id": "id"}):
+        client_id: Optional[str] = None
+        name: Optional[str] = None
+        accounts: List[_AccountWire] = []
+        holdings: List[_HoldingWire] = []
+        transactions: List[_TransactionWire] = []
+
+class MsgspecBackend(StdlibBackend):
+    """
+    Decoder backend: msgspec decodes bytes against a typed schema of the partner JSON (validating and
+    converting fields in C), and the dataclasses are built positionally from the result.
+    """
+    name = "msgspec"
+
+    def __init__(self):
+        self.client_decoder = msgspec.json.Decoder(_ClientWire, strict=False)
+        self.clients_decoder = msgspec.json.Decoder(List[_ClientWire], strict=False)
+
+    def loads(self, data):
+        return msgspec.json.decode(data)
+
+    def decode_client(self, data, columnar: bool = False) -> Client:
+        return self._to_client(self.client_decoder.decode(data), columnar)
+
+    def decode_clients(self, data, columnar: bool = False) -> List[Client]:
+        return [self._to_client(wire, columnar) for wire in self.clients_decoder.decode(data)]
+
+    @staticmethod
+    def _to_client(wire, columnar: bool) -> Client:
+        holdings = [Holding(h.holding_id, h.account_id, h.name, h.security, h.quantity, h.buy_price, h.is_cash_like)
+                    for h in wire.holdings]
+        transactions = [Transaction(t.transaction_id, t.account_id, t.holding_id, t.type, t.quantity, t.value,
+                                    t.date, t.settle_date)
+                        for t in wire.transactions]
+        if columnar:
+            pool = StringPool()
+            holdings_table, transactions_table = HoldingsTable(pool), TransactionsTable(pool)
+            for holding in holdings:
+                holdings_table.append(holding)
+            for transaction in transactions:
+                transactions_table.append(transaction)
+            holdings, transactions = holdings_table, transactions_table
+        return Client(
+            client_id=wire.client_id,
+            name=wire.name,
+            accounts=[Account(a.account_id, a.value, a.currency, a.name, a.type) for a in wire.accounts],
+            holdings=holdings,
+            transactions=transactions
+        )
+
+def available_backends() -> Dict[str, StdlibBackend]:
+    """The decoder backends whose libraries are installed, fastest last."""
+    backends = {"stdlib": StdlibBackend()}
+    if orjson is not None:
+        backends["orjson"] = OrjsonBackend()
+    if msgspec is not None:
+        backends["msgspec"] = MsgspecBackend()
+    return backends
+
+def get_backend(name: str = "stdlib") -> StdlibBackend:
+    """Returns a decoder backend by name; "auto" picks the fastest one installed."""
+    backends = available_backends()
+    if name == "auto":
+        return list(backends.values())[-1]
+    if name not in backends:
+        raise ValueError(f"Decoder backend {name!r} is not available (installed: {', '.join(backends)})")
+    return backends[name]
+
+_WHITESPACE = " \t\r\n"
+
+def _decode_array_range(path: str, start: int, stop: int, columnar: bool = False, read_size: int = 1 << 20):
+    """
+    Decodes the elements of a JSON array file that start in the byte range [start, stop), where
+    start is assumed to be the first byte of an element. Returns (start, end, closed, clients):
+    end is the byte offset of the first element at or after stop (or of the closing ']', in which
+    case closed is True). end is None when start turned out not to be an element boundary.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = text_decoder.decode(f.read(max(stop - start, 1)))
+        stop_char = len(text)  # Elements start with an ASCII character, so this is exact enough
+        eof = False
+
+        def read_more(size):
+            nonlocal text, eof
+            raw = f.read(size)
+            eof = not raw
+            text += text_decoder.decode(raw, final=eof)
+            return not eof
+
+        def skip_whitespace(pos):
+            while True:
+                while pos < len(text) and text[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(text) or not read_more(read_size):
+                    return pos
+
+        clients = []
+        pos = skip_whitespace(0)
+        closed = False
+        while True:
+            if pos >= len(text):
+                return start, None, False, None  # Ran off the end of the file: not inside a well-formed array
+            if text[pos] == "]":
+                closed = True
+                break
+            if pos >= stop_char:
+                break
+            size = read_size
+            while True:
+                try:
+                    element, after = decoder.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    if not eof and read_more(size):
+                        size *= 2  # Large element split across reads: grow geometrically
+                        continue
+                    return start, None, False, None
+                if after == len(text) and read_more(size):
+                    continue  # A scalar ending at the edge of the buffer may be truncated
+                break
+            clients.append(Client.from_dict(element, columnar))
+            pos = skip_whitespace(after)
+            if pos < len(text) and text[pos] == ",":
+                pos = skip_whitespace(pos + 1)
+            elif pos >= len(text) or text[pos] != "]":
+                return start, None, False, None
+
+    end = start + (pos if text.isascii() else len(text[:pos].encode("utf-8")))
+    return start, end, closed, clients
+
+def _decode_array_range_task(path: str, start: int, stop: int, columnar: bool):
+    """Process-pool entry point: a chunk that fails to decode may just have a mis-guessed start, so any
+    error is reported as "not an element boundary" and the range is re-decoded (and raises) in the parent."""
+    try:
+        return _decode_array_range(path, start, stop, columnar)
+    except Exception:
+        return start, None, False, None
+
+def _decode_array_bytes(data: bytes, columnar: bool, backend_name: str) -> List[Client]:
+    return get_backend(backend_name).decode_clients(data, columnar)
+
+def _find_array_start(f) -> int:
+    """Byte offset of the first element (or the closing ']') of a JSON array file."""
+    f.seek(0)
+    head = f.read(64 * 1024)
+    whitespace = _WHITESPACE.encode()
+    pos = len(codecs.BOM_UTF8) if head.startswith(codecs.BOM_UTF8) else 0
+    while pos < len(head) and head[pos] in whitespace:
+        pos += 1
+    if head[pos:pos + 1] != b"[":
+        raise ValueError("Expected a top-level JSON array")
+    pos += 1
+    while pos < len(head) and head[pos] in whitespace:
+        pos += 1
+    return pos
+
+_JSON_KEY = rb'"(?:[^"\\]|\\.)*"'
+_JSON_SCALAR = rb'(?:"(?:[^"\\]|\\.)*"|-?[0-9][0-9.eE+-]*|true|false|null)'
+
+def _element_signature(f, offset: int) -> Optional[re.Pattern]:
+    """
+    A regex for ',' followed by the start of an object that opens with the same keys as the element at
+    offset: its first two keys when the first value is a scalar (e.g. {"id": "c_1", "name": ...), which
+    nested objects rarely share, else just its first key. None if the element is not an object.
+    """
+    f.seek(offset)
+    head = f.read(4096)
+    leading = re.match(rb'\{\s*(' + _JSON_KEY + rb')\s*:\s*' + _JSON_SCALAR + rb'\s*,\s*(' + _JSON_KEY + rb')\s*:', head)
+    if leading is not None:
+        first_key, second_key = leading.groups()
+        return re.compile(rb',\s*(\{\s*' + re.escape(first_key) + rb'\s*:\s*' + _JSON_SCALAR
+                          + rb'\s*,\s*' + re.escape(second_key) + rb'\s*:)')
+    leading = re.match(rb'\{\s*(' + _JSON_KEY + rb')\s*:', head)
+    if leading is None:
+        return None
+    return re.compile(rb',\s*(\{\s*' + re.escape(leading.group(1)) + rb'\s*:)')
+
+def _find_element_start(f, offset: int, signature: re.Pattern, file_size: int,
+                        window: int = 64 * 1024, overlap: int = 1024) -> Optional[int]:
+    """
+    Guesses the first top-level element at or after offset: the first match of signature, scanning
+    forward a window at a time without decoding anything. It is only a guess (a nested object could
+    look the same); decode_many_parallel checks every chunk boundary against the chunk before it.
+    """
+    while offset < file_size:
+        f.seek(offset)
+        match = signature.search(f.read(window + overlap))  # The overlap catches a match across windows
+        if match is not None:
+            return offset + match.start(1)
+        offset += window
+    return None
+
+def split_json_array(path: str, num_chunks: int) -> List[tuple]:
+    """
+    Splits a JSON array file of objects into up to num_chunks (start, stop) byte ranges, each starting
+    at (what is most likely) a top-level element. Only a window near each split point is read, so
+    splitting costs a few small reads however large the file. See JsonDecoder.decode_many_parallel
+    for how the guesses are checked.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        starts = [_find_array_start(f)]
+        signature = _element_signature(f, starts[0])
+        if signature is not None:
+            for k in range(1, num_chunks):
+                guess = starts[0] + k * (file_size - starts[0]) // num_chunks
+                if guess <= starts[-1]:
+                    continue
+                element_start = _find_element_start(f, guess, signature, file_size)
+                if element_start is None:
+                    break
+                starts.append(element_start)
+    return list(zip(starts, starts[1:] + [file_size]))
+
 class JsonDecoder:
+    backend = StdlibBackend()  # Swap with JsonDecoder.use_backend("auto"), "orjson" or "msgspec"
+
+    @classmethod
+    def use_backend(cls, name: str) -> None:
+        cls.backend = get_backend(name)
+
+    @classmethod
+    def decode(cls, json_string, columnar: bool = False) -> Client:
+        """Decodes one client from a JSON str or bytes with the configured backend."""
+        return cls.backend.decode_client(json_string, columnar)
+
     @staticmethod
-    def decode(json_string: str) -> Client:
-        data = json.loads(json_string)
-        return Client.from_dict(data)
+    def iter_clients(fileobj: IO, chunk_size: int = 64 * 1024, columnar: bool = False) -> Iterator[Client]:
+        """
+        Yields one Client at a time from a file object containing a top-level JSON array
+        of clients, keeping memory flat regardless of file size.
+        """
+        for data in iter_json_array(fileobj, chunk_size):
+            yield Client.from_dict(data, columnar)
+
+    @classmethod
+    def decode_many_parallel(cls, paths_or_chunks: Iterable, workers: Optional[int] = None, columnar: bool = False,
+                             chunk_bytes: int = 8 * 1024 * 1024) -> Iterator[Client]:
+        """
+        Decodes partner JSON arrays on a process pool and yields the Clients in input order.
+
+        Each item is either a path to a JSON array file, which is split into byte ranges of about
+        chunk_bytes starting at top-level elements, or bytes holding a whole JSON array (decoded as one
+        task with the configured backend). A file's split points are guesses: every chunk reports
+        where its last element ended, and a chunk that does not start exactly there is re-decoded in
+        this process from the right offset, so the result is always the same as decoding serially.
+
+        At most 2 * workers chunks are in flight. Clients pickle compactly (see Client.__reduce__) in
+        either layout; columnar=True does not make them smaller to ship back.
+        """
+        workers = workers or os.cpu_count() or 1
+
+        def tasks():
+            for item in paths_or_chunks:
+                if isinstance(item, (bytes, bytearray, memoryview)):
+                    yield (_decode_array_bytes, (bytes(item), columnar, cls.backend.name)), None
+                    continue
+                path = os.fspath(item)
+                num_chunks = max(1, os.path.getsize(path) // chunk_bytes)
+                ranges = split_json_array(path, num_chunks)
+                for index, (start, stop) in enumerate(ranges):
+                    yield (_decode_array_range_task, (path, start, stop, columnar)), (path, stop, index == 0)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            task_iter = tasks()
+
+            def submit_next():
+                for (fn, args), meta in task_iter:
+                    pending.append((pool.submit(fn, *args), meta))
+                    return
+
+            for _ in range(2 * workers):
+                submit_next()
+
+            expected = None  # Byte offset where the current file's next chunk must start
+            closed = False
+            while pending:
+                future, meta = pending.popleft()
+                submit_next()
+                result = future.result()
+                if meta is None:
+                    yield from result
+                    continue
+
+                path, stop, first_chunk = meta
+                start, end, chunk_closed, clients = result
+                if first_chunk:
+                    expected, closed = start, False
+                if closed:
+                    continue  # The array already ended before this chunk's guessed start
+                if start != expected or end is None:
+                    # A mis-guessed boundary: decode this chunk's range from where the previous chunk ended
+                    start, end, chunk_closed, clients = _decode_array_range(path, expected, max(stop, expected), columnar)
+                    if end is None:
+                        raise ValueError(f"Malformed JSON array in {path} near byte {expected}")
+                expected, closed = end, chunk_closed
+                yield from clients
 
 # Example usage:
 if __name__ == "__main__":
@@ -0,0 +1,283 @@
+import asyncio
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass
+class PricingStats:
+    """Counters for the pricing layer; hit_ratio is the share of symbol lookups served from the cache."""
+    hits: int = 0
+    misses: int = 0
+    provider_calls: int = 0
+    symbols_fetched: int = 0
+    evictions: int = 0
+    unpriced: int = 0  # Symbols left without a price because the request deadline passed or the provider failed
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PriceCache:
+    """
+    Thread-safe quote cache with a per-entry TTL and LRU eviction once max_size symbols are held.
+    A provider answer of None (unknown symbol) is cached too, so it is not re-requested every time.
+    Evicted quotes are remembered (up to another max_size of them) so a re-fetch can tell whether
+    the price moved.
+    """
+    MISSING = object()  # Returned by get() for a symbol that is not cached (None is a valid cached answer)
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()  # symbol -> (price, expires_at), oldest first
+        self.evicted: "OrderedDict[str, Optional[float]]" = OrderedDict()  # symbol -> last price, oldest first
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, symbol: str, default=MISSING):
+        """Returns the cached price, or default when absent or expired."""
+        with self.lock:
+            entry = self.entries.get(symbol)
+            if entry is None or entry[1] <= self.clock():
+                # An expired quote stays until it is refreshed or evicted, so put() can tell if it moved
+                return default
+            self.entries.move_to_end(symbol)
+            return entry[0]
+
+    def put(self, symbol: str, price: Optional[float]) -> bool:
+        """
+        Caches a quote; returns True if the symbol had a known price and this one differs from it. A
+        symbol's first quote returns False, since nothing can have been rendered with another price.
+        """
+        with self.lock:
+            previous = self.entries.get(symbol)
+            if previous is not None:
+                known, previous_price = True, previous[0]
+            else:
+                known, previous_price = symbol in self.evicted, self.evicted.pop(symbol, None)
+            self.entries[symbol] = (price, self.clock() + self.ttl)
+            self.entries.move_to_end(symbol)
+            while len(self.entries) > self.max_size:
+                evicted_symbol, (evicted_price, _) = self.entries.popitem(last=False)
+                self.evicted[evicted_symbol] = evicted_price
+                self.evictions += 1
+            while len(self.evicted) > self.max_size:
+                self.evicted.popitem(last=False)
+            return known and previous_price != price
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drops one symbol, or every quote when symbol is None (e.g. on a price tick for the whole book)."""
+        with self.lock:
+            if symbol is None:
+                self.entries.clear()
+                self.evicted.clear()
+            else:
+                self.entries.pop(symbol, None)
+                self.evicted.pop(symbol, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class SdkPriceProvider:
+    """Adapts a one-symbol SDK function such as getPrice(security) to the bulk provider interface."""
+    max_batch = 1  # Each SDK call prices one symbol, so batches of one let the async path run them concurrently
+
+    def __init__(self, get_price: Callable[[str], Optional[float]]):
+        self.get_price = get_price
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        return {symbol: self.get_price(symbol) for symbol in symbols}
+
+
+class FakePriceProvider:
+    """
+    Local stand-in for a market data provider, for benchmarks: each call costs `latency` seconds plus
+    `per_symbol_latency` per symbol (or `tail_latency` for a `tail_probability` share of calls), and
+    prices are deterministic per symbol. max_batch=1 mimics a one-symbol-per-call SDK.
+    """
+
+    def __init__(self, latency: float = 0.005, per_symbol_latency: float = 0.0, max_batch: Optional[int] = None,
+                 tail_latency: float = 0.0, tail_probability: float = 0.0):
+        self.latency = latency
+        self.per_symbol_latency = per_symbol_latency
+        self.tail_latency = tail_latency
+        self.tail_probability = tail_probability
+        if max_batch is not None:
+            self.max_batch = max_batch
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def call_latency(self, num_symbols: int) -> float:
+        with self.lock:
+            self.calls += 1
+        if self.tail_probability and random.random() < self.tail_probability:
+            return self.tail_latency
+        return self.latency + self.per_symbol_latency * num_symbols
+
+    @staticmethod
+    def price_of(symbol: str) -> float:
+        return 10 + zlib.crc32(symbol.encode("utf-8")) % 99000 / 100
+
+    def get_price(self, symbol: str) -> float:
+        return self.get_prices([symbol])[symbol]
+
+    def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        time.sleep(self.call_latency(len(symbols)))
+        return {symbol: self.price_of(symbol) for symbol in symbols}
+
+    async def get_prices_async(self, symbols: List[str]) -> Dict[str, float]:
+        await asyncio.sleep(self.call_latency(len(symbols)))
+        return {symbol: self.price_of(symbol) for symbol in symbols}
+
+
+class PricingService:
+    """
+    Batched, cached price lookups: securities are de-duplicated, served from the PriceCache where
+    possible, and the misses are requested from the provider in bulk (max_batch symbols per call,
+    or fewer if the provider declares a smaller max_batch).
+
+    get_prices_async runs the provider calls for the misses concurrently (at most max_concurrency at
+    once) and returns whatever has arrived by the deadline. With a blocking provider the calls run
+    on a thread pool, so those still running at the deadline carry on and fill the cache for later
+    requests; with an async provider they are cancelled at the deadline, since the caller's event
+    loop (e.g. Flask's, one per request) may close as soon as the request returns.
+
+    version is the price snapshot version: it moves whenever a known quote changes (a fetch or a
+    price tick that returned a different price, an invalidation), so anything rendered from prices
+    can be cached against it. A symbol's first fetch does not move it.
+    """
+
+    def __init__(self, provider, cache: Optional[PriceCache] = None, max_batch: int = 500, max_concurrency: int = 32):
+        self.provider = provider
+        self.cache = cache if cache is not None else PriceCache()
+        self.max_batch = min(max_batch, getattr(provider, "max_batch", max_batch))
+        self.max_concurrency = max_concurrency
+        # For blocking providers on the async path; threads are only started once it is used
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="pricing")
+        self.stats = PricingStats()
+        self.lock = threading.Lock()
+        self.version = 0
+
+    def _bump_version(self) -> None:
+        with self.lock:
+            self.version += 1
+
+    def _lookup_cached(self, securities: Iterable[Optional[str]]) -> Tuple[Dict[str, Optional[float]], List[str]]:
+        """Splits the distinct non-None securities into cached prices and the symbols still to fetch."""
+        prices = {}
+        missing = []
+        for symbol in dict.fromkeys(security for security in securities if security is not None):
+            price = self.cache.get(symbol)
+            if price is PriceCache.MISSING:
+                missing.append(symbol)
+            else:
+                prices[symbol] = price
+        with self.lock:
+            self.stats.hits += len(prices)
+            self.stats.misses += len(missing)
+        return prices, missing
+
+    def _batches(self, symbols: List[str]) -> List[List[str]]:
+        return [symbols[start:start + self.max_batch] for start in range(0, len(symbols), self.max_batch)]
+
+    def _store(self, batch: List[str], fetched: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+        prices = {symbol: fetched.get(symbol) for symbol in batch}
+        changed = [self.cache.put(symbol, price) for symbol, price in prices.items()]
+        with self.lock:
+            self.stats.provider_calls += 1
+            self.stats.symbols_fetched += len(batch)
+            self.stats.evictions = self.cache.evictions
+            if any(changed):
+                self.version += 1
+        return prices
+
+    def apply_price_tick(self, prices: Dict[str, Optional[float]]) -> bool:
+        """Pushes quotes from a price feed into the cache; returns True if any of them moved the snapshot."""
+        changed = [self.cache.put(symbol, price) for symbol, price in prices.items()]
+        if any(changed):
+            self._bump_version()
+            return True
+        return False
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drops cached quotes (see PriceCache.invalidate) and starts a new snapshot version."""
+        self.cache.invalidate(symbol)
+        self._bump_version()
+
+    def _fetch_batch(self, batch: List[str]) -> Dict[str, Optional[float]]:
+        return self._store(batch, self.provider.get_prices(batch))
+
+    def get_prices(self, securities: Iterable[Optional[str]]) -> Dict[str, Optional[float]]:
+        """Prices for every distinct non-None security, with one provider call per max_batch cache misses."""
+        prices, missing = self._lookup_cached(securities)
+        for batch in self._batches(missing):
+            prices.update(self._fetch_batch(batch))
+        return prices
+
+    async def _fetch_batch_async(self, batch: List[str], semaphore: asyncio.Semaphore) -> Dict[str, Optional[float]]:
+        async with semaphore:
+            if hasattr(self.provider, "get_prices_async"):
+                return self._store(batch, await self.provider.get_prices_async(batch))
+            # The thread stores into the cache itself, so a call that outlives the request still warms it
+            return await asyncio.get_running_loop().run_in_executor(self.executor, self._fetch_batch, batch)
+
+    async def get_prices_async(self, securities: Iterable[Optional[str]],
+                               timeout: Optional[float] = None) -> Tuple[Dict[str, Optional[float]], Set[str]]:
+        """
+        Like get_prices, but fetches the misses concurrently and gives up waiting after timeout seconds.
+        Returns (prices, unpriced): unpriced holds the symbols whose price did not arrive in time (or
+        whose provider call failed); they are None in prices. Only calls to a blocking provider
+        outlive the deadline (see the class docstring).
+        """
+        prices, missing = self._lookup_cached(securities)
+        if not missing:
+            return prices, set()
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = {asyncio.ensure_future(self._fetch_batch_async(batch, semaphore)): batch
+                 for batch in self._batches(missing)}
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending and hasattr(self.provider, "get_prices_async"):
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)  # Let them unwind before returning
+
+        unpriced = set()
+        for task, batch in tasks.items():
+            if task in done and task.exception() is None:
+                prices.update(task.result())
+            else:
+                unpriced.update(batch)
+                prices.update(dict.fromkeys(batch))
+        with self.lock:
+            self.stats.unpriced += len(unpriced)
+        return prices, unpriced
+
+    def get_price(self, security: Optional[str]) -> Optional[float]:
+        if security is None:
+            return None
+        return self.get_prices([security])[security]
+
+    def metrics(self) -> dict:
+        """Hit/miss counters and cache size, e.g. for a /metrics endpoint or a benchmark report."""
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_ratio": round(self.stats.hit_ratio, 4),
+            "provider_calls": self.stats.provider_calls,
+            "symbols_fetched": self.stats.symbols_fetched,
+            "evictions": self.stats.evictions,
+            "unpriced": self.stats.unpriced,
+            "cached_symbols": len(self.cache),
+            "version": self.version,
+        }
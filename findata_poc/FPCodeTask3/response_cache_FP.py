@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str  # Unquoted strong validator
+    created_at: float
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int = 0
+    misses: int = 0
+    not_modified: int = 0  # Conditional GETs answered with 304
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """
+    Rendered response bodies keyed by e.g. (client_id, data_date, price_version), with an ETag per body,
+    LRU eviction and a max_age (so a response is re-rendered, and its prices refreshed, at least that often).
+    Keys must be tuples whose first element identifies the client, so invalidate(client_id) can find them.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_age: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.clock = clock
+        self.entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = ResponseCacheStats()
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.clock() - entry.created_at >= self.max_age:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+    def put(self, key: tuple, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body=body, etag=self.make_etag(body), created_at=self.clock())
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def get_or_render(self, key_func: Callable[[], tuple], render: Callable[[], bytes]) -> CachedResponse:
+        """
+        Returns the cached response for key_func(), or renders, caches and returns it. The key is taken
+        again after rendering, since rendering can itself move the price version (e.g. refreshed quotes).
+        """
+        entry = self.get(key_func())
+        if entry is None:
+            body = render()
+            entry = self.put(key_func(), body)
+        return entry
+
+    def matches(self, entry: CachedResponse, if_none_match: Iterable[str]) -> bool:
+        """True when a conditional GET already holds this body, i.e. the caller can answer 304."""
+        if entry.etag in if_none_match or "*" in if_none_match:
+            with self.lock:
+                self.stats.not_modified += 1
+            return True
+        return False
+
+    def invalidate(self, client_id: Optional[Hashable] = None) -> None:
+        """Drops one client's responses (e.g. a new data_date was loaded), or all of them."""
+        with self.lock:
+            if client_id is None:
+                self.entries.clear()
+            else:
+                for key in [key for key in self.entries if key[0] == client_id]:
+                    del self.entries[key]
+            self.stats.invalidations += 1
+
+    def metrics(self) -> dict:
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_ratio": round(self.stats.hit_ratio, 4),
+            "not_modified": self.stats.not_modified,
+            "invalidations": self.stats.invalidations,
+            "cached_responses": len(self.entries),
+        }
@@ -0,0 +1,188 @@
+import threading
+import unittest
+import psycopg2
+import psycopg2.pool
+from db_insert_client_FP import ConnectionPool
+
+
+class FakeCursor:
+    """Cursor of a FakeConnection: execute raises psycopg2.OperationalError once the connection is broken."""
+
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.conn.executed.append(query)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """
+    Minimal DB-API connection stand-in for exercising ConnectionPool without a server: it records
+    the queries and rollbacks it sees, and break_() makes it fail like a connection the server dropped.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.executed = []
+        self.rollbacks = 0
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.rollbacks += 1
+
+    def break_(self):
+        self.broken = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def make_pool(self, **kwargs) -> ConnectionPool:
+        self.clock = FakeClock()
+        self.opened = []
+        self.refuse = False
+
+        def connect():
+            if self.refuse:
+                raise psycopg2.OperationalError("connection refused")
+            conn = FakeConnection()
+            self.opened.append(conn)
+            return conn
+
+        kwargs.setdefault("timeout", 0.05)
+        return ConnectionPool("dbname=test", connect=connect, clock=self.clock, **kwargs)
+
+    def test_opens_min_size_up_front(self):
+        pool = self.make_pool(min_size=2, max_size=4)
+        stats = pool.stats()
+        self.assertEqual((stats.created, stats.size, stats.idle), (2, 2, 2))
+
+    def test_returned_connection_is_reused_and_rolled_back(self):
+        pool = self.make_pool(min_size=0, max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertIs(pool.getconn(), conn)
+        stats = pool.stats()
+        self.assertEqual((stats.checkouts, stats.created, stats.size, stats.idle), (2, 1, 1, 0))
+
+    def test_most_recently_used_first(self):
+        pool = self.make_pool(min_size=0, max_size=2)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        self.assertIs(pool.getconn(), second)
+
+    def test_discard_closes_and_frees_the_slot(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        conn = pool.getconn()
+        pool.putconn(conn, discard=True)
+        self.assertTrue(conn.closed)
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, conn)
+        stats = pool.stats()
+        self.assertEqual((stats.created, stats.closed, stats.size), (2, 1, 1))
+
+    def test_broken_connection_is_discarded_on_return(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        conn = pool.getconn()
+        conn.break_()  # rollback() fails
+        pool.putconn(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats().idle, 0)
+
+    def test_context_manager_returns_connection(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        with pool.connection() as conn:
+            self.assertEqual(pool.stats().idle, 0)
+        self.assertEqual(pool.stats().idle, 1)
+        with self.assertRaises(RuntimeError):
+            with pool.connection():
+                raise RuntimeError("query failed")
+        self.assertIs(pool.getconn(), conn)
+
+    def test_timeout_raises_and_is_not_counted_as_checkout(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        pool.getconn()
+        with self.assertRaises(psycopg2.pool.PoolError):
+            pool.getconn(timeout=0.01)
+        stats = pool.stats()
+        self.assertEqual((stats.checkouts, stats.waits), (1, 1))
+        self.assertGreater(stats.wait_time, 0)
+
+    def test_waiter_gets_returned_connection(self):
+        pool = self.make_pool(min_size=0, max_size=1, timeout=5.0)
+        conn = pool.getconn()
+        timer = threading.Timer(0.05, pool.putconn, args=(conn,))
+        timer.start()
+        self.assertIs(pool.getconn(), conn)
+        timer.join()
+        self.assertEqual(pool.stats().waits, 1)
+
+    def test_failed_connect_releases_the_slot(self):
+        pool = self.make_pool(min_size=0, max_size=1)
+        self.refuse = True
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn()
+        stats = pool.stats()
+        self.assertEqual((stats.checkouts, stats.size), (0, 0))
+
+    def test_idle_connections_above_min_size_are_evicted(self):
+        pool = self.make_pool(min_size=1, max_size=3, max_idle=10.0)
+        conns = [pool.getconn() for _ in range(3)]
+        for conn in conns:
+            pool.putconn(conn)
+        self.clock.now += 11.0
+        pool.putconn(pool.getconn())
+        stats = pool.stats()
+        self.assertEqual((stats.size, stats.idle, stats.closed), (1, 1, 2))
+
+    def test_health_check_replaces_dead_connection(self):
+        pool = self.make_pool(min_size=1, max_size=1, health_check_after=30.0)
+        dead = self.opened[0]
+        dead.break_()
+        self.clock.now += 31.0
+        conn = pool.getconn()
+        self.assertIsNot(conn, dead)
+        self.assertTrue(dead.closed)
+        stats = pool.stats()
+        self.assertEqual((stats.failed_health_checks, stats.created, stats.size), (1, 2, 1))
+
+    def test_health_check_keeps_live_connection(self):
+        pool = self.make_pool(min_size=1, max_size=1, health_check_after=30.0)
+        conn = pool.getconn()
+        self.assertEqual(conn.executed, [])
+        pool.putconn(conn)
+        self.clock.now += 31.0
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(conn.executed, ["SELECT 1"])
+
+    def test_closeall_closes_idle_connections(self):
+        pool = self.make_pool(min_size=2, max_size=2)
+        pool.closeall()
+        self.assertTrue(all(conn.closed for conn in self.opened))
+        self.assertEqual(pool.stats().size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()